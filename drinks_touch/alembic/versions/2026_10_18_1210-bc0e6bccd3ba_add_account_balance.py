@@ -0,0 +1,73 @@
+"""Add account balance
+
+Revision ID: bc0e6bccd3ba
+Revises: a9a8ad053f43
+Create Date: 2026-10-18 12:10:42.113508
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "bc0e6bccd3ba"
+down_revision: Union[str, None] = "a9a8ad053f43"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "account",
+        sa.Column(
+            "balance",
+            sa.Numeric(precision=10, scale=2),
+            server_default="0",
+            nullable=False,
+        ),
+    )
+    # No transactions must be added between calculating the balances
+    # and creating the trigger
+    op.execute("LOCK TABLE tx IN SHARE MODE")
+    op.execute(
+        """
+        UPDATE account SET balance = COALESCE(
+            (SELECT SUM(tx.amount) FROM tx WHERE tx.account_id = account.id), 0
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION tx_update_account_balance() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE account SET balance = balance - OLD.amount
+                WHERE id = OLD.account_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE account SET balance = balance + NEW.amount
+                WHERE id = NEW.account_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tx_update_account_balance
+        AFTER INSERT OR UPDATE OF amount, account_id OR DELETE ON tx
+        FOR EACH ROW EXECUTE FUNCTION tx_update_account_balance()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tx_update_account_balance ON tx")
+    op.execute("DROP FUNCTION tx_update_account_balance()")
+    op.drop_column("account", "balance")
@@ -0,0 +1,40 @@
+"""Add indexes for hot queries
+
+Revision ID: 5d2f7c1e9a04
+Revises: bc0e6bccd3ba
+Create Date: 2026-10-18 14:35:08.402117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2f7c1e9a04"
+down_revision: Union[str, None] = "bc0e6bccd3ba"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Transaction history, monthly stats and summary mails of an account
+    op.create_index("ix_tx_account_id_created_at", "tx", ["account_id", "created_at"])
+    # Prefix search of names, e.g. `lower(name) LIKE 'ab%'`. text_pattern_ops
+    # allows LIKE to use the index regardless of the collation of the database.
+    op.create_index(
+        "ix_account_name_lower",
+        "account",
+        [sa.text("lower(name) text_pattern_ops")],
+    )
+    op.create_index("ix_sales_ean_date", "sales", ["ean", "date"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_sales_ean_date", table_name="sales")
+    op.drop_index("ix_account_name_lower", table_name="account")
+    op.drop_index("ix_tx_account_id_created_at", table_name="tx")
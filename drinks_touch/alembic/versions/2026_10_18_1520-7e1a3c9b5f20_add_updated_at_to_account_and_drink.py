@@ -0,0 +1,65 @@
+"""Add updated_at to account and drink
+
+Revision ID: 7e1a3c9b5f20
+Revises: 5d2f7c1e9a04
+Create Date: 2026-10-18 15:20:17.730214
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7e1a3c9b5f20"
+down_revision: Union[str, None] = "5d2f7c1e9a04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Changes of the balance are ignored, they happen on every purchase and
+    # the balance isn't part of the local replica
+    op.execute(
+        """
+        CREATE FUNCTION set_updated_at() RETURNS trigger AS $$
+        BEGIN
+            IF to_jsonb(NEW) - 'balance' - 'updated_at'
+                IS DISTINCT FROM to_jsonb(OLD) - 'balance' - 'updated_at' THEN
+                NEW.updated_at = now();
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in ("account", "drink"):
+        op.add_column(
+            table,
+            sa.Column(
+                "updated_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=False,
+            ),
+        )
+        op.create_index(f"ix_{table}_updated_at", table, ["updated_at"])
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_set_updated_at
+            BEFORE UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION set_updated_at()
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("drink", "account"):
+        op.execute(f"DROP TRIGGER {table}_set_updated_at ON {table}")
+        op.drop_index(f"ix_{table}_updated_at", table_name=table)
+        op.drop_column(table, "updated_at")
+    op.execute("DROP FUNCTION set_updated_at()")
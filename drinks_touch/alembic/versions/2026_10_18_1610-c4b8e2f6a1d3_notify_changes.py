@@ -0,0 +1,70 @@
+"""Notify changes
+
+Revision ID: c4b8e2f6a1d3
+Revises: 7e1a3c9b5f20
+Create Date: 2026-10-18 16:10:51.284671
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4b8e2f6a1d3"
+down_revision: Union[str, None] = "7e1a3c9b5f20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # See change_feed.py. Updates that only change the balance are skipped,
+    # the insert into tx that caused them is notified already.
+    op.execute(
+        """
+        CREATE FUNCTION notify_change() RETURNS trigger AS $$
+        DECLARE
+            changed jsonb;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                changed := to_jsonb(OLD);
+            ELSE
+                changed := to_jsonb(NEW);
+            END IF;
+            IF TG_OP = 'UPDATE'
+                AND to_jsonb(NEW) - 'balance' - 'updated_at'
+                    = to_jsonb(OLD) - 'balance' - 'updated_at' THEN
+                RETURN NULL;
+            END IF;
+            PERFORM pg_notify(
+                'drinks_touch_changes',
+                json_build_object(
+                    'table', TG_TABLE_NAME,
+                    'op', TG_OP,
+                    'id', changed -> 'id',
+                    'account_id', changed -> 'account_id',
+                    'ean', changed ->> 'ean'
+                )::text
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in ("account", "drink", "tx"):
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_notify_change
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION notify_change()
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("tx", "drink", "account"):
+        op.execute(f"DROP TRIGGER {table}_notify_change ON {table}")
+    op.execute("DROP FUNCTION notify_change()")
@@ -0,0 +1,34 @@
+"""Add id to tx history index
+
+Revision ID: 8f3d6a2c7b91
+Revises: c4b8e2f6a1d3
+Create Date: 2026-10-18 16:55:03.918442
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8f3d6a2c7b91"
+down_revision: Union[str, None] = "c4b8e2f6a1d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The transaction history is paginated by (created_at, id), see
+    # keyset_page. The index still serves queries by account_id and created_at.
+    op.create_index(
+        "ix_tx_account_id_created_at_id", "tx", ["account_id", "created_at", "id"]
+    )
+    op.drop_index("ix_tx_account_id_created_at", table_name="tx")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_tx_account_id_created_at", "tx", ["account_id", "created_at"])
+    op.drop_index("ix_tx_account_id_created_at_id", table_name="tx")
@@ -0,0 +1,131 @@
+"""Add account_month
+
+Revision ID: 2a9c5e7d1f46
+Revises: 8f3d6a2c7b91
+Create Date: 2026-10-18 17:30:26.551093
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2a9c5e7d1f46"
+down_revision: Union[str, None] = "8f3d6a2c7b91"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "account_month",
+        sa.Column("account_id", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("amount", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("tx_count", sa.Integer(), nullable=False),
+        sa.Column("closing_balance", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["account_id"],
+            ["account.id"],
+            name=op.f("fk_account_month_account_id_account"),
+        ),
+        sa.PrimaryKeyConstraint("account_id", "month", name=op.f("pk_account_month")),
+    )
+    # Months are in UTC, so that they don't depend on the time zone of the
+    # connection that inserts the transaction
+    op.execute(
+        """
+        CREATE FUNCTION account_month_add(
+            p_account_id integer,
+            p_created_at timestamptz,
+            p_amount numeric,
+            p_count integer
+        ) RETURNS void AS $$
+        DECLARE
+            p_month date := date_trunc('month', p_created_at AT TIME ZONE 'UTC')::date;
+        BEGIN
+            INSERT INTO account_month
+                (account_id, month, amount, tx_count, closing_balance)
+            VALUES (
+                p_account_id, p_month, 0, 0,
+                COALESCE((
+                    SELECT closing_balance FROM account_month
+                    WHERE account_id = p_account_id AND month < p_month
+                    ORDER BY month DESC LIMIT 1
+                ), 0)
+            )
+            ON CONFLICT (account_id, month) DO NOTHING;
+            UPDATE account_month
+            SET amount = amount + p_amount, tx_count = tx_count + p_count
+            WHERE account_id = p_account_id AND month = p_month;
+            UPDATE account_month
+            SET closing_balance = closing_balance + p_amount
+            WHERE account_id = p_account_id AND month >= p_month;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION tx_update_account_month() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM account_month_add(
+                    OLD.account_id, OLD.created_at, -OLD.amount, -1
+                );
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM account_month_add(
+                    NEW.account_id, NEW.created_at, NEW.amount, 1
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # Like in backfill_rollups.py. No transactions must be added between
+    # filling the table and creating the trigger.
+    op.execute("LOCK TABLE tx IN SHARE MODE")
+    op.execute(
+        """
+        INSERT INTO account_month
+            (account_id, month, amount, tx_count, closing_balance)
+        SELECT
+            account_id,
+            month,
+            amount,
+            tx_count,
+            SUM(amount) OVER (PARTITION BY account_id ORDER BY month)
+        FROM (
+            SELECT
+                account_id,
+                date_trunc('month', created_at AT TIME ZONE 'UTC')::date AS month,
+                SUM(amount) AS amount,
+                COUNT(*) AS tx_count
+            FROM tx
+            GROUP BY 1, 2
+        ) AS monthly
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tx_update_account_month
+        AFTER INSERT OR UPDATE OF amount, account_id, created_at OR DELETE ON tx
+        FOR EACH ROW EXECUTE FUNCTION tx_update_account_month()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tx_update_account_month ON tx")
+    op.execute("DROP FUNCTION tx_update_account_month()")
+    op.execute(
+        "DROP FUNCTION account_month_add(integer, timestamptz, numeric, integer)"
+    )
+    op.drop_table("account_month")
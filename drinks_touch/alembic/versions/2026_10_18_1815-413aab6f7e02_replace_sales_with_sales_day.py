@@ -0,0 +1,88 @@
+"""Replace sales with sales_day
+
+Revision ID: 413aab6f7e02
+Revises: 2a9c5e7d1f46
+Create Date: 2026-10-18 18:15:42.907318
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "413aab6f7e02"
+down_revision: Union[str, None] = "2a9c5e7d1f46"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "sales_day",
+        sa.Column("ean", sa.Text(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("ean", "date", name=op.f("pk_sales_day")),
+    )
+    # Only inserts are counted. Like the rows of the sales table before,
+    # the statistics stay when transactions are deleted later, e.g. together
+    # with an account. The date is the one of the session, like CURRENT_DATE,
+    # which was the default of sales.date.
+    op.execute(
+        """
+        CREATE FUNCTION tx_update_sales_day() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO sales_day (ean, date, count)
+            VALUES (NEW.ean, NEW.created_at::date, 1)
+            ON CONFLICT (ean, date)
+            DO UPDATE SET count = sales_day.count + 1;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute("LOCK TABLE sales IN SHARE MODE")
+    op.execute(
+        """
+        INSERT INTO sales_day (ean, date, count)
+        SELECT ean, date, COUNT(*) FROM sales GROUP BY ean, date
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tx_update_sales_day
+        AFTER INSERT ON tx
+        FOR EACH ROW WHEN (NEW.ean IS NOT NULL)
+        EXECUTE FUNCTION tx_update_sales_day()
+        """
+    )
+    op.drop_index("ix_sales_ean_date", table_name="sales")
+    op.drop_table("sales")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tx_update_sales_day ON tx")
+    op.execute("DROP FUNCTION tx_update_sales_day()")
+    op.create_table(
+        "sales",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "date", sa.Date(), server_default=sa.text("CURRENT_DATE"), nullable=False
+        ),
+        sa.Column("ean", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_sales")),
+    )
+    op.create_index("ix_sales_ean_date", "sales", ["ean", "date"])
+    op.execute(
+        """
+        INSERT INTO sales (date, ean)
+        SELECT date, ean FROM sales_day, generate_series(1, count)
+        ORDER BY date
+        """
+    )
+    op.drop_table("sales_day")
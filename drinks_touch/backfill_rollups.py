@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Rebuilds the aggregated tables from the transactions.
+
+Triggers keep them up to date, so this is only needed if they were changed
+by hand or a trigger was disabled. Transactions can't be added while it
+runs. sales_day can't be rebuilt, it still counts the sales of deleted
+transactions. Run it from the repository root:
+
+    $ ./drinks_touch/backfill_rollups.py
+    $ ./drinks_touch/backfill_rollups.py --account 42
+"""
+
+import argparse
+import logging
+
+from sqlalchemy import text
+
+from database.storage import engine
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_MONTH = """
+INSERT INTO account_month (account_id, month, amount, tx_count, closing_balance)
+SELECT
+    account_id,
+    month,
+    amount,
+    tx_count,
+    SUM(amount) OVER (PARTITION BY account_id ORDER BY month)
+FROM (
+    SELECT
+        account_id,
+        date_trunc('month', created_at AT TIME ZONE 'UTC')::date AS month,
+        SUM(amount) AS amount,
+        COUNT(*) AS tx_count
+    FROM tx
+    WHERE CAST(:account_id AS integer) IS NULL OR account_id = :account_id
+    GROUP BY 1, 2
+) AS monthly
+"""
+
+
+def backfill_account_month(connection, account_id: int | None = None) -> int:
+    """
+    Same as the migration that created the table. The caller must lock tx,
+    so that the trigger doesn't add to the rows in the meantime.
+    """
+    connection.execute(
+        text(
+            "DELETE FROM account_month "
+            "WHERE CAST(:account_id AS integer) IS NULL OR account_id = :account_id"
+        ),
+        {"account_id": account_id},
+    )
+    result = connection.execute(text(ACCOUNT_MONTH), {"account_id": account_id})
+    return result.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--account", type=int, help="only rebuild the rows of this account id"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    with engine.begin() as connection:
+        connection.execute(text("LOCK TABLE tx IN SHARE MODE"))
+        rows = backfill_account_month(connection, args.account)
+        logger.info("account_month: %d rows", rows)
+
+
+if __name__ == "__main__":
+    main()
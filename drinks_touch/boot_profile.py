@@ -0,0 +1,102 @@
+"""
+Measures how long it takes until the application is usable.
+
+The start is split into phases, which are always measured and logged once
+`report()` is called. Set BOOT_PROFILE=1 to additionally measure how long
+each imported module took. Import this module before anything else,
+otherwise the imports before it aren't measured.
+"""
+
+import builtins
+import logging
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import config
+
+logger = logging.getLogger(__name__)
+
+_start = time.perf_counter()
+_last_mark = _start
+_phases: list[tuple[str, float]] = []
+
+# Module name -> [cumulative, self] import time in seconds
+_imports: defaultdict[str, list[float]] = defaultdict(lambda: [0.0, 0.0])
+# Time spent in nested imports, for every import that is currently running
+_import_stack: list[float] = []
+_builtin_import = builtins.__import__
+_main_thread = threading.main_thread()
+_reported = False
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level == 0 and name in sys.modules:
+        return _builtin_import(name, globals, locals, fromlist, level)
+    if threading.current_thread() is not _main_thread:
+        return _builtin_import(name, globals, locals, fromlist, level)
+
+    _import_stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _builtin_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = _import_stack.pop()
+        if _import_stack:
+            _import_stack[-1] += elapsed
+        if level and globals:
+            # Relative import, e.g. `from .x import y`
+            base = (globals.get("__package__") or "").rsplit(".", level - 1)[0]
+            name = f"{base}.{name}" if name else base
+        _imports[name][0] += elapsed
+        _imports[name][1] += elapsed - nested
+
+
+if config.BOOT_PROFILE:
+    builtins.__import__ = _timed_import
+
+
+def mark(phase: str):
+    """
+    Ends the current phase of the start. Ignored after `report()`.
+    """
+    global _last_mark
+    if _reported:
+        return
+    now = time.perf_counter()
+    _phases.append((phase, now - _last_mark))
+    _last_mark = now
+
+
+def report(budget: float | None = config.BOOT_TIME_BUDGET, top: int = 25):
+    """
+    Logs the phases and, if enabled, the slowest imports. Only the first call
+    has an effect, later calls (e.g. on every frame) are ignored.
+    """
+    global _reported
+    if _reported:
+        return
+    _reported = True
+    if builtins.__import__ is _timed_import:
+        builtins.__import__ = _builtin_import
+
+    total = _last_mark - _start
+    lines = [f"Started in {total:.2f}s"]
+    lines += [f"  {duration:7.3f}s  {phase}" for phase, duration in _phases]
+    if _imports:
+        lines.append(f"Slowest imports (cumulative / self), top {top}:")
+        slowest = sorted(_imports.items(), key=lambda item: item[1][1], reverse=True)
+        lines += [
+            f"  {cumulative:7.3f}s {self_time:7.3f}s  {name}"
+            for name, (cumulative, self_time) in slowest[:top]
+        ]
+    logger.info("\n".join(lines))
+    if budget and total > budget:
+        logger.warning(
+            "Start took %.2fs, which is more than the budget of %.2fs. "
+            "Run with BOOT_PROFILE=1 to see which imports are slow.",
+            total,
+            budget,
+        )
@@ -0,0 +1,118 @@
+"""
+Notifications about changes of accounts, drinks and transactions.
+
+Triggers on these tables send a NOTIFY with the changed row when the
+transaction commits, no matter which process made the change. A background
+thread LISTENs for them and passes them to the subscribers, e.g. the local
+replica, which then doesn't have to wait for its next update.
+
+Notifications sent while the connection was lost are gone. After every
+(re)connect, the subscribers get `RESET`, which means that anything might
+have changed.
+"""
+
+import json
+import logging
+import select
+import threading
+import time
+from collections.abc import Callable
+from typing import NamedTuple
+
+from database.storage import engine
+
+logger = logging.getLogger(__name__)
+
+
+class Change(NamedTuple):
+    table: str
+    op: str
+    id: int | str | None = None
+    account_id: int | None = None
+    ean: str | None = None
+
+    def concerns_account(self, account_id: int) -> bool:
+        """
+        True if the account or its balance might have changed
+        """
+        if self.op == "RESET":
+            return True
+        if self.table == "account":
+            return self.id == account_id
+        return self.table == "tx" and self.account_id == account_id
+
+    def concerns_drink(self, ean: str) -> bool:
+        if self.op == "RESET":
+            return True
+        return self.table == "drink" and self.ean == ean
+
+
+RESET = Change("*", "RESET")
+
+
+class ChangeFeed:
+    # Also used in the migration that creates the triggers
+    CHANNEL = "drinks_touch_changes"
+    # A lost connection is only noticed when something is sent
+    KEEPALIVE_INTERVAL = 30
+    RETRY_DELAY = 5
+
+    def __init__(self):
+        self.callbacks: list[Callable[[Change], None]] = []
+        self.thread: threading.Thread | None = None
+
+    def subscribe(self, callback: Callable[[Change], None]):
+        """
+        The callback is called in the thread of the feed
+        """
+        self.callbacks.append(callback)
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._run, name="ChangeFeed")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self._listen()
+            except Exception as e:
+                logger.warning("Lost connection for change notifications: %s", e)
+            time.sleep(self.RETRY_DELAY)
+
+    def _listen(self):
+        connection = engine.raw_connection()
+        # Stays open as long as it listens, so it shouldn't block the pool
+        connection.detach()
+        try:
+            dbapi_connection = connection.driver_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.CHANNEL}")
+            self._dispatch(RESET)
+            while True:
+                readable, _, _ = select.select(
+                    [dbapi_connection], [], [], self.KEEPALIVE_INTERVAL
+                )
+                if not readable:
+                    with dbapi_connection.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    notify = dbapi_connection.notifies.pop(0)
+                    self._dispatch(Change(**json.loads(notify.payload)))
+        finally:
+            connection.close()
+
+    def _dispatch(self, change: Change):
+        for callback in self.callbacks:
+            try:
+                callback(change)
+            except Exception:
+                logger.exception("Couldn't handle %s", change)
+
+
+change_feed = ChangeFeed()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Checks that the queries that run on every screen or for every account use
+an index.
+
+The database is filled with a realistic amount of accounts, transactions and
+sales and analyzed. Then every hot query is explained and the check fails if
+the plan reads a large table completely, i.e. contains a sequential scan of
+it or an index scan without a condition. Everything happens in a single
+transaction that is rolled back, but it locks the tables until it is done,
+so don't run it against the production database. Run it from the repository
+root after the migrations:
+
+    $ (cd drinks_touch && alembic upgrade head)
+    $ ./drinks_touch/check_query_plans.py
+
+The queries are copies of the ones used by the screens, keep them in sync
+when changing those.
+"""
+
+import argparse
+import json
+import sys
+import uuid
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select, text, tuple_
+
+from database.models import Account, AccountMonth, SalesDay, Tx
+from database.storage import engine
+
+# Tables that grow with every purchase or member. Small tables like drink
+# are cheaper to read completely than through an index.
+LARGE_TABLES = {"account", "account_month", "tx", "sales_day"}
+
+ACCOUNTS = 5000
+TX_PER_ACCOUNT = 20
+DRINKS = 200
+DAYS = 730
+
+
+def seed(connection) -> tuple[int, str, str]:
+    """
+    Returns the id and name of an account and the EAN of a drink to query
+    """
+    connection.execute(
+        text(
+            """
+            WITH seeded AS (
+                INSERT INTO account (name, enabled, tx_history_visible)
+                SELECT md5('check-query-plans-' || i), true, true
+                FROM generate_series(1, :accounts) i
+                RETURNING id
+            )
+            INSERT INTO tx (id, created_at, account_id, amount, ean)
+            SELECT
+                gen_random_uuid(),
+                now() - random() * make_interval(days => :days),
+                seeded.id,
+                -1.50,
+                'check-query-plans-' || (random() * :drinks)::int
+            FROM seeded, generate_series(1, :tx_per_account)
+            """
+        ),
+        {
+            "accounts": ACCOUNTS,
+            "days": DAYS,
+            "drinks": DRINKS,
+            "tx_per_account": TX_PER_ACCOUNT,
+        },
+    )
+    for table in sorted(LARGE_TABLES):
+        connection.execute(text(f"ANALYZE {table}"))
+    account_id, name = connection.execute(
+        text("SELECT id, name FROM account WHERE name = md5('check-query-plans-1')")
+    ).one()
+    return account_id, name, "check-query-plans-1"
+
+
+def hot_queries(account_id: int, name: str, ean: str) -> dict:
+    since = datetime.now() - timedelta(days=30)
+    tx_id = uuid.uuid4()
+    return {
+        "names screen (NamesScreen)": select(Account)
+        .filter(Account.name_starts_with(name[:2]))
+        .filter(Account.enabled)
+        .order_by(Account.name),
+        "auto completion (auto_complete_account_name)": select(Account)
+        .where(
+            Account.name_starts_with(name[:3]),
+            Account.enabled,
+            Account.name != name,
+        )
+        .order_by(Account.name)
+        .limit(11),
+        "balance (Account.balance)": select(Account.stored_balance).where(
+            Account.id == account_id
+        ),
+        "history next page (keyset_page)": select(Tx)
+        .where(
+            Tx.account_id == account_id,
+            tuple_(Tx.created_at, Tx.id) < tuple_(since, tx_id),
+        )
+        .order_by(Tx.created_at.desc(), Tx.id.desc())
+        .limit(9),
+        "history previous page (keyset_page)": select(Tx)
+        .where(
+            Tx.account_id == account_id,
+            tuple_(Tx.created_at, Tx.id) > tuple_(since, tx_id),
+        )
+        .order_by(Tx.created_at.asc(), Tx.id.asc())
+        .limit(9),
+        "history count (TransactionHistoryLogScreen)": select(func.count(Tx.id)).where(
+            Tx.account_id == account_id
+        ),
+        "monthly stats (TransactionHistoryStatsScreen)": select(
+            AccountMonth.month, AccountMonth.closing_balance
+        )
+        .where(AccountMonth.account_id == account_id)
+        .order_by(AccountMonth.month),
+        "summary mail (get_recent_transactions)": select(Tx).where(
+            Tx.account_id == account_id,
+            Tx.created_at >= since,
+        ),
+        "sales of a drink": select(SalesDay.date, SalesDay.count).where(
+            SalesDay.ean == ean, SalesDay.date >= date.today() - timedelta(days=30)
+        ),
+    }
+
+
+def full_scans(plan: dict) -> list[str]:
+    """
+    Returns the large tables that are read completely by the plan
+    """
+    scans = []
+    table = plan.get("Relation Name")
+    if table in LARGE_TABLES:
+        node_type = plan["Node Type"]
+        if node_type == "Seq Scan":
+            scans.append(f"Seq Scan on {table}")
+        elif node_type in ("Index Scan", "Index Only Scan") and (
+            "Index Cond" not in plan
+        ):
+            scans.append(f"{node_type} on {table} without condition")
+    for child in plan.get("Plans", []):
+        scans += full_scans(child)
+    return scans
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="print the plans of all queries"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            queries = hot_queries(*seed(connection))
+            for label, query in queries.items():
+                compiled = query.compile(engine)
+                (explained,) = connection.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+                ).one()
+                plan = explained[0]["Plan"]
+                scans = full_scans(plan)
+                failed |= bool(scans)
+                print(f"{'FAIL' if scans else 'ok  '} {label}")
+                for scan in scans:
+                    print(f"     {scan}")
+                if scans or args.verbose:
+                    print(json.dumps(plan, indent=2))
+        finally:
+            transaction.rollback()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
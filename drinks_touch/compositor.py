@@ -0,0 +1,94 @@
+import contextlib
+
+from pygame import Rect, Surface
+
+with contextlib.redirect_stdout(None):
+    import pygame
+
+
+class Compositor:
+    """
+    Collects the regions of the display surface that changed during a frame
+    and pushes only those regions to the display.
+
+    Everything that draws to the display surface reports the area it touched
+    via `damage()`. Whoever paints the background (the ScreenManager) uses
+    `clip_rects` to repaint only the damaged areas.
+    """
+
+    # Above this number of rects, a single flip is cheaper than many small updates
+    MAX_RECTS = 16
+
+    def __init__(self, surface: Surface):
+        self.surface = surface
+        self.full = True
+        self.rects: list[Rect] = []
+        self.updated_area = 0
+
+    def damage(self, *rects: Rect | tuple | None):
+        if self.full:
+            return
+        bounds = self.surface.get_rect()
+        for rect in rects:
+            if rect is None:
+                continue
+            rect = Rect(rect).clip(bounds)
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+            self.rects.append(rect)
+        if len(self.rects) > self.MAX_RECTS * 4:
+            self.rects = self._merge(self.rects)
+
+    def damage_all(self):
+        self.full = True
+        self.rects = []
+
+    def collides(self, rect: Rect | tuple) -> bool:
+        if self.full:
+            return True
+        return Rect(rect).collidelist(self.rects) != -1
+
+    @property
+    def clip_rects(self) -> list[Rect]:
+        """
+        Regions that have to be repainted in this frame
+        """
+        if self.full:
+            return [self.surface.get_rect()]
+        self.rects = self._merge(self.rects)
+        if len(self.rects) > self.MAX_RECTS:
+            self.damage_all()
+            return [self.surface.get_rect()]
+        return self.rects
+
+    def present(self):
+        """
+        Pushes the damaged regions to the display and starts a new frame
+        """
+        if self.full:
+            pygame.display.flip()
+            self.updated_area = self.surface.get_width() * self.surface.get_height()
+        elif self.rects:
+            rects = self.clip_rects
+            if self.full:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+            self.updated_area = sum(r.width * r.height for r in rects)
+        else:
+            self.updated_area = 0
+        self.full = False
+        self.rects = []
+
+    @staticmethod
+    def _merge(rects: list[Rect]) -> list[Rect]:
+        """
+        Combines overlapping rects, so that no pixel is pushed twice
+        """
+        merged: list[Rect] = []
+        for rect in rects:
+            rect = Rect(rect)
+            while (idx := rect.collidelist(merged)) != -1:
+                rect.union_ip(merged.pop(idx))
+            merged.append(rect)
+        return merged
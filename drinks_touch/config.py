@@ -23,6 +23,25 @@ DEBUG_LEVEL = os.environ.get("DEBUG_LEVEL", "False") in [
     "yes",
 ]
 
+# Check on every frame that no element changed without being invalidated,
+# by comparing calculate_hash() with the last frame. Slow, only for development.
+VERIFY_INVALIDATION = os.environ.get("VERIFY_INVALIDATION", "False") in [
+    "True",
+    "true",
+    "1",
+    "yes",
+]
+
+# Log how long each module takes to import, see boot_profile.py
+BOOT_PROFILE = os.environ.get("BOOT_PROFILE", "False") in [
+    "True",
+    "true",
+    "1",
+    "yes",
+]
+# Seconds until the first frame of the start screen should be shown
+BOOT_TIME_BUDGET = float(os.environ.get("BOOT_TIME_BUDGET", "10"))
+
 BASE_URL = os.environ.get("BASE_URL", "http://localhost:5002")
 # Generate a secret with python3 -c 'import os; print(os.urandom(32).hex())'
 SECRET_KEY = os.environ.get("SECRET_KEY")
@@ -52,16 +71,22 @@ class Color(enum.Enum):
     CYAN = (0, 255, 255, 255)
 
 
-if bn := os.environ.get("BUILD_NUMBER"):
-    BUILD_NUMBER = bn
-else:
-    BUILD_NUMBER = (
-        os.popen("git rev-parse --short HEAD").read().strip() or "git is not available"
-    )
+def __getattr__(name: str):
+    # Calling git takes a while, so it's only done when the value is needed
+    if name == "BUILD_NUMBER":
+        value = (
+            os.environ.get("BUILD_NUMBER")
+            or os.popen("git rev-parse --short HEAD").read().strip()
+            or "git is not available"
+        )
+    elif name == "GIT_REPO_AVAILABLE":
+        value = os.popen("git rev-parse --is-inside-work-tree").read().strip() == "true"
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
 
-GIT_REPO_AVAILABLE = (
-    os.popen("git rev-parse --is-inside-work-tree").read().strip() == "true"
-)
 REPO_PATH = Path(__file__).parent.parent
 
 OIDC_DISCOVERY_URL = os.environ.get(
@@ -82,6 +107,14 @@ ICAL_URL = os.environ.get(
     "https://mail.flipdot.org/SOGo/dav/public/com@flipdot.org/Calendar/41-64A05800-5-1B5BE560.ics",
 )
 ICAL_FILE_PATH = REPO_PATH / "tmp/fd-calendar.ics"
+# Frame timings are written here on SIGUSR2, see frame_stats.py
+FRAME_STATS_PATH = REPO_PATH / "tmp"
+# Rasterized SVG images, see svg_cache.py
+SVG_CACHE_PATH = REPO_PATH / "tmp/svg-cache"
+# Purchases that weren't written to the database yet, see purchase_journal.py
+PURCHASE_JOURNAL_PATH = REPO_PATH / "tmp/purchase-journal.sqlite3"
+# Copy of the accounts and drinks, see local_replica.py
+LOCAL_REPLICA_PATH = REPO_PATH / "tmp/local-replica.json"
 
 SENTRY_DSN = os.environ.get("SENTRY_DSN", "")
 
@@ -115,6 +148,10 @@ SCANNER_DEVICE_PATH = os.environ.get("SCANNER_DEVICE_PATH", "/dev/ttyACM0")
 WEBSERVER_PORT = os.environ.get("WEBSERVER_PORT", 5002)
 
 FPS = 60
+# Frame rate while nothing on the screen is animating. Input is handled immediately.
+IDLE_FPS = 4
+# Turn the display black after this many seconds without input. 0 disables it.
+DISPLAY_SLEEP_TIMEOUT = int(os.environ.get("DISPLAY_SLEEP_TIMEOUT", 30 * 60))
 
 
 class Font(enum.Enum):
@@ -4,4 +4,5 @@ from .recharge_event import RechargeEvent
 from .tetris import TetrisGame, TetrisPlayer
 from .tx import Tx
 from .appsettings import AppSettings
-from .sale import Sale
+from .sales_day import SalesDay
+from .account_month import AccountMonth
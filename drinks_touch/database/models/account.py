@@ -1,7 +1,21 @@
 import logging
+from collections.abc import Iterable, Sequence
 from decimal import Decimal
 
-from sqlalchemy import Column, Integer, String, UUID, DateTime, Boolean, func, Date
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    UUID,
+    DateTime,
+    Boolean,
+    Date,
+    Numeric,
+    Index,
+    func,
+    inspect,
+    select,
+)
 
 
 from database.storage import Base, Session, with_db
@@ -33,12 +47,101 @@ class Account(Base):
     last_sepa_deposit = Column(Date())
     summary_email_notification_setting = Column(String(50), unique=False)
     tx_history_visible = Column(Boolean, default=False)
+    # Set by a trigger, used to update the local replica, see local_replica.py
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    # Sum of the amounts of all transactions of this account. Kept up to date by
+    # a trigger on the tx table, see ReconcileBalancesTask.
+    stored_balance = Column(
+        "balance",
+        Numeric(precision=10, scale=2, asdecimal=True),
+        nullable=False,
+        server_default="0",
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_account_name_lower",
+            func.lower(name).label("name_lower"),
+            postgresql_ops={"name_lower": "text_pattern_ops"},
+        ),
+    )
+
+    @staticmethod
+    def name_starts_with(prefix: str):
+        """
+        Case-insensitive filter for names that start with `prefix`. Unlike
+        `name.ilike(prefix + "%")`, it can use the index on lower(name).
+        """
+        return func.lower(Account.name).like(f"{prefix.lower()}%")
+
+    # Set by `load_balances()`
+    _loaded_balance = None
+
+    @property
+    def balance(self) -> Decimal:
+        # Imported here, because the journal imports the models
+        from purchase_journal import purchase_journal
+
+        if self._loaded_balance is not None:
+            balance = self._loaded_balance
+        else:
+            balance = self._query_balance()
+        # Purchases that weren't copied to the database yet
+        return balance + purchase_journal.pending_amount(self.id)
 
     @property
+    def known_balance(self) -> Decimal | None:
+        """
+        Like `balance`, but never queries the database, so that the screens
+        can show it even if Postgres is slow or unreachable. It's the balance
+        of the local replica or the one loaded with the account, None if
+        neither is known.
+        """
+        # Imported here, because both import the models
+        from local_replica import replica
+        from purchase_journal import purchase_journal
+
+        if (known := replica.balance(self.id)) is not None:
+            # Purchases that were drained after the replica read the balance
+            # are still missing in it
+            balance, drained_after = known
+        else:
+            # Only if it was loaded, reading the attribute might query it
+            balance = inspect(self).dict.get("stored_balance")
+            drained_after = None
+        if balance is None:
+            return None
+        return balance + purchase_journal.pending_amount(self.id, drained_after)
+
+    @with_db
+    def _query_balance(self) -> Decimal:
+        # Not `stored_balance`, which is outdated once a transaction was added
+        # after the account was loaded
+        query = select(Account.stored_balance).where(Account.id == self.id)
+        return Session().execute(query).scalar() or Decimal(0)
+
+    @staticmethod
     @with_db
-    def balance(self):
-        from database.models import Tx
+    def balances(ids: Iterable[int] | None = None) -> dict[int, Decimal]:
+        """
+        Balances of the accounts with the given ids, or of all accounts,
+        read in a single query
+        """
+        query = select(Account.id, Account.stored_balance)
+        if ids is not None:
+            query = query.where(Account.id.in_(list(ids)))
+        return dict(Session().execute(query).all())
 
-        return Session().query(func.sum(Tx.amount)).filter(
-            Tx.account_id == self.id,
-        ).scalar() or Decimal(0)
+    @staticmethod
+    def load_balances(accounts: Sequence["Account"]):
+        """
+        Reads the balances of all given accounts in a single query. Afterwards,
+        `balance` of these objects returns the read value instead of querying
+        it again, so only use it for objects that are thrown away afterwards,
+        e.g. in a task that mails all members.
+        """
+        balances = Account.balances(account.id for account in accounts)
+        for account in accounts:
+            account._loaded_balance = balances.get(account.id, Decimal(0))
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer, Numeric
+
+from database.storage import Base
+
+
+class AccountMonth(Base):
+    """
+    Sum and number of the transactions of an account in a month (in UTC),
+    and its balance at the end of the month. Kept up to date by a trigger on
+    the tx table, can be rebuilt with backfill_rollups.py.
+    """
+
+    __tablename__ = "account_month"
+    account_id = Column(ForeignKey("account.id"), primary_key=True)
+    month = Column(Date(), primary_key=True)
+    amount = Column(Numeric(precision=10, scale=2, asdecimal=True), nullable=False)
+    tx_count = Column(Integer, nullable=False)
+    closing_balance = Column(
+        Numeric(precision=10, scale=2, asdecimal=True), nullable=False
+    )
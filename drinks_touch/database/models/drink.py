@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, DateTime, Numeric
+from sqlalchemy.sql import func
 
 from database.storage import Base
 
@@ -11,3 +12,7 @@ class Drink(Base):
     size = Column(Numeric, unique=False)
     timestamp = Column(DateTime(), unique=False)
     price = Column(Numeric(precision=8, scale=2, asdecimal=True))
+    # Set by a trigger, used to update the local replica, see local_replica.py
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
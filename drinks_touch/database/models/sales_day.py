@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Date, Integer, Text
+
+from database.storage import Base
+
+
+class SalesDay(Base):
+    """
+    Number of drinks with an EAN sold per day. A trigger on the tx table
+    counts every purchase when it is inserted, deleting transactions doesn't
+    change it.
+    """
+
+    __tablename__ = "sales_day"
+    ean = Column(Text(), primary_key=True)
+    date = Column(Date(), primary_key=True)
+    count = Column(Integer, nullable=False)
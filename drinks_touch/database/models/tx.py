@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, UUID, Text, ForeignKey, Numeric, DateTime
+from sqlalchemy import Column, UUID, Text, ForeignKey, Numeric, DateTime, Index
 from sqlalchemy.sql import func
 
 from database.storage import Base
@@ -16,3 +16,7 @@ class Tx(Base):
     ean = Column(Text(), nullable=True)
     account_id = Column(ForeignKey("account.id"), nullable=False)
     amount = Column(Numeric(precision=8, scale=2, asdecimal=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_tx_account_id_created_at_id", account_id, created_at, id),
+    )
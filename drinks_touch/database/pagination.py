@@ -0,0 +1,55 @@
+from typing import NamedTuple, Sequence
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import Session as SessionType
+
+from database.storage import Session
+
+
+class KeysetPage(NamedTuple):
+    items: list
+    has_newer: bool
+    has_older: bool
+
+
+def keyset_page(
+    query: Select,
+    order: Sequence,
+    size: int,
+    after: Sequence | None = None,
+    before: Sequence | None = None,
+    last: bool = False,
+    session: SessionType | None = None,
+) -> KeysetPage:
+    """
+    A page of `query`, sorted descending by the columns in `order`, which
+    must be unique together, e.g. (Tx.created_at, Tx.id).
+
+    Unlike OFFSET, the database doesn't have to skip the rows of the
+    previous pages, so every page is as fast as the first one, as long as
+    there is an index on the columns. Instead of a page number, pass the
+    key (the values of the `order` columns) of the last row of the current
+    page as `after` to get the next page, or the key of its first row as
+    `before` to get the previous one. `last` returns the oldest `size` rows.
+    `session` defaults to the global session, the web app passes its own.
+    """
+    key = tuple_(*order)
+    if before is not None:
+        query = query.where(key > tuple_(*before))
+    elif after is not None:
+        query = query.where(key < tuple_(*after))
+    # The previous page starts at the row right before `before`, so it's
+    # found by going backwards
+    backwards = before is not None or last
+    if backwards:
+        query = query.order_by(*(column.asc() for column in order))
+    else:
+        query = query.order_by(*(column.desc() for column in order))
+    # One more, to know whether there is another page
+    session = session or Session()
+    items = session.execute(query.limit(size + 1)).scalars().all()
+    has_more = len(items) > size
+    items = items[:size]
+    if backwards:
+        return KeysetPage(items[::-1], has_newer=has_more, has_older=not last)
+    return KeysetPage(items, has_newer=after is not None, has_older=has_more)
@@ -3,6 +3,8 @@ import sys
 
 import traceback
 
+from frame_stats import frame_stats
+
 
 def debug(sig, frame):
     code = ""
@@ -15,6 +17,10 @@ def debug(sig, frame):
     print(code, file=sys.stderr)
 
 
+def dump_frame_stats(sig, frame):
+    frame_stats.dump()
+
+
 def listen():
     """
     Installs a signal handler for debugging purposes.
@@ -23,5 +29,8 @@ def listen():
     ```sh
     kill -s SIGUSR1 `pidof game.py`
     ```
+
+    Write the frame timings to tmp/ by sending SIGUSR2.
     """
     signal.signal(signal.SIGUSR1, debug)  # Register handler
+    signal.signal(signal.SIGUSR2, dump_frame_stats)
@@ -4,6 +4,8 @@ import pygame
 
 
 class Animation(BaseElm):
+    observed = BaseElm.observed | {"ts"}
+
     def __init__(
         self,
         src: str,
@@ -45,6 +47,10 @@ class Animation(BaseElm):
             )
         )
 
+    @property
+    def animating(self) -> bool:
+        return True
+
     def tick(self, dt: float):
         super().tick(dt)
         self.ts += dt
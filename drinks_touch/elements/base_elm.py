@@ -1,9 +1,134 @@
 from __future__ import annotations
+
+import time
+from typing import NamedTuple
+
 import pygame
 from pygame import Surface
 
+import config
+from frame_stats import frame_stats
+from surface_pool import release_surface
+
+_MISSING = object()
+
+
+class Layout(NamedTuple):
+    width: float
+    height: float
+    # Position of every child, relative to the element
+    positions: list[tuple[float, float]]
+
+
+class ElementList(list):
+    """
+    List of child elements. Modifying it invalidates the owner,
+    which is either an element or a screen.
+    """
+
+    def __init__(self, owner, elements=()):
+        super().__init__(elements)
+        self.owner = owner
+        self._added(self)
+
+    @classmethod
+    def replace(cls, owner, old, elements) -> ElementList:
+        """
+        Creates the list that replaces `old`. Elements that aren't
+        part of the new list anymore are detached from the owner.
+        """
+        new = cls(owner, elements)
+        if isinstance(old, ElementList):
+            for elm in old:
+                if elm not in new:
+                    elm.remove_parent(owner)
+        return new
+
+    def _added(self, elements):
+        for elm in elements:
+            elm.add_parent(self.owner)
+        self.owner.invalidate()
+
+    def _removed(self, elements):
+        for elm in elements:
+            if elm not in self:
+                elm.remove_parent(self.owner)
+        self.owner.invalidate()
+
+    def append(self, elm):
+        super().append(elm)
+        self._added([elm])
+
+    def extend(self, elements):
+        elements = list(elements)
+        super().extend(elements)
+        self._added(elements)
+
+    def __iadd__(self, elements):
+        self.extend(elements)
+        return self
+
+    def insert(self, index, elm):
+        super().insert(index, elm)
+        self._added([elm])
+
+    def remove(self, elm):
+        super().remove(elm)
+        self._removed([elm])
+
+    def pop(self, index=-1):
+        elm = super().pop(index)
+        self._removed([elm])
+        return elm
+
+    def clear(self):
+        elements = list(self)
+        super().clear()
+        self._removed(elements)
+
+    def __setitem__(self, key, value):
+        old = self[key] if isinstance(key, slice) else [self[key]]
+        super().__setitem__(key, value)
+        self._removed(old)
+        self._added(self[key] if isinstance(key, slice) else [value])
+
+    def __delitem__(self, key):
+        old = self[key] if isinstance(key, slice) else [self[key]]
+        super().__delitem__(key)
+        self._removed(old)
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self.owner.invalidate()
+
+    def reverse(self):
+        super().reverse()
+        self.owner.invalidate()
+
 
 class BaseElm:
+    # Assigning a different value to one of these attributes invalidates the
+    # element and its ancestors, so that they are rendered again in the next frame.
+    # Subclasses extend this with every attribute their `_render` depends on.
+    observed = frozenset(
+        {
+            "children",
+            "pos",
+            "_height",
+            "_width",
+            "visible",
+            "align_right",
+            "align_bottom",
+            "focus",
+            "padding_top",
+            "padding_right",
+            "padding_bottom",
+            "padding_left",
+        }
+    )
+    # Cached result of `_arrange()`, cleared on invalidation
+    _layout: Layout | None = None
+
     def __init__(
         self,
         children: list["BaseElm"] | None = None,
@@ -19,6 +144,8 @@ class BaseElm:
     ):
         if pos is None:
             pos = (0, 0)
+        # Elements or screens that contain this element
+        self._parents: list = []
         self.ts_active = 0
         self.pos = pos
         self._height = height
@@ -60,10 +187,67 @@ class BaseElm:
             self.padding_bottom = padding[2]
             self.padding_left = padding[3]
 
+    def __setattr__(self, name, value):
+        if name not in self.observed:
+            super().__setattr__(name, value)
+            return
+        old = self.__dict__.get(name, _MISSING)
+        if name == "children":
+            value = ElementList.replace(self, old, value)
+        elif isinstance(value, BaseElm) and value is not old:
+            value.add_parent(self)
+            if isinstance(old, BaseElm):
+                old.remove_parent(self)
+        super().__setattr__(name, value)
+        # Vectors are mutable and might have been changed in place
+        if old == value and not isinstance(value, pygame.Vector2):
+            return
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Marks the element and everything containing it to be rendered again.
+        Only needed if something changed that isn't listed in `observed`.
+        """
+        self.dirty = True
+        self._layout = None
+        for parent in getattr(self, "_parents", ()):
+            parent.invalidate()
+
+    @property
+    def layout(self) -> Layout:
+        """
+        Size of the element and the positions of its children, calculated by
+        `_arrange()` once after every invalidation. The positions are assigned
+        to the children, so that events can be mapped to them.
+        """
+        if self._layout is None:
+            layout = self._arrange()
+            for child, pos in zip(self.children, layout.positions):
+                # Might invalidate this element if the child moved
+                child.pos = pos
+            self._layout = layout
+        return self._layout
+
+    def _arrange(self) -> Layout:
+        """
+        Implemented by containers that position their children
+        """
+        raise NotImplementedError
+
+    def add_parent(self, parent):
+        if not any(p is parent for p in self._parents):
+            self._parents.append(parent)
+
+    def remove_parent(self, parent):
+        self._parents = [p for p in self._parents if p is not parent]
+
     def calculate_hash(self):
         """
         Calculate a hash based on the element's properties.
-        This can be used to determine if the element has changed.
+        Not used for rendering, since elements are invalidated when an observed
+        attribute changes. With config.VERIFY_INVALIDATION, it is used to check
+        that nothing changed without being invalidated.
         """
         return hash(
             (
@@ -115,6 +299,14 @@ class BaseElm:
     def box(self):
         return self.screen_pos + (self.width, self.height)
 
+    @property
+    def animating(self) -> bool:
+        """
+        True if the element changes without any user interaction.
+        As long as any element is animating, frames are rendered at full rate.
+        """
+        return any(child.animating for child in self.children)
+
     def tick(self, dt: float):
         """
         Called every frame to update the element.
@@ -186,13 +378,25 @@ class BaseElm:
         return None
 
     def render(self, *args, **kwargs) -> Surface | None:
-        if self.last_hash != (new_hash := self.calculate_hash()):
-            self.dirty = True
-            self.last_hash = new_hash
+        if config.VERIFY_INVALIDATION and not self.dirty:
+            assert (
+                self.last_hash == self.calculate_hash()
+            ), f"{self!r} changed without being invalidated"
         if self.dirty:
+            # Release the old surfaces only after rendering the new ones. Otherwise,
+            # the new surface could be the old one, and wouldn't be recognized as changed.
+            old_surfaces = self._surface, self._overlay_surface
+            # Cleared before rendering, tasks change e.g. a ProgressBar from
+            # their threads. Such a change must be rendered in the next frame.
+            self.dirty = False
+            start = time.perf_counter()
             self._surface = self._render(*args, **kwargs)
             self._overlay_surface = self._render_overlay(*args, **kwargs)
-            self.dirty = False
+            frame_stats.add_element(type(self).__name__, time.perf_counter() - start)
+            for surface in old_surfaces:
+                release_surface(surface)
+            if config.VERIFY_INVALIDATION:
+                self.last_hash = self.calculate_hash()
         return self._surface
 
     def render_overlay(self, *args, **kwargs) -> Surface | None:
@@ -1,4 +1,5 @@
 from config import Color, Font
+from surface_pool import get_surface, release_surface
 from .base_elm import BaseElm
 
 import contextlib
@@ -8,6 +9,8 @@ with contextlib.redirect_stdout(None):
 
 
 class Button(BaseElm):
+    observed = BaseElm.observed | {"_disabled", "bg_color", "color", "inner"}
+
     def __init__(
         self,
         children: list["BaseElm"] | None = None,
@@ -136,7 +139,7 @@ class Button(BaseElm):
 
         size = (self.width, self.height)
 
-        surface = pygame.Surface(size, pygame.SRCALPHA)
+        surface = get_surface(size)
         if self.focus:
             surface.fill(tuple(c * 0.7 for c in self.color.value), (0, 0, *size))
         else:
@@ -144,6 +147,7 @@ class Button(BaseElm):
 
         if inner is not None:
             surface.blit(inner, (self.padding_left, self.padding_top))
+            release_surface(inner)
         pygame.draw.rect(surface, self.color.value, (0, 0, *size), 1)
         return surface
 
@@ -3,10 +3,12 @@ from pygame import Surface
 
 import config
 from config import Color
-from elements.base_elm import BaseElm
+from elements.base_elm import BaseElm, Layout
+from surface_pool import get_surface, release_surface
 
 
 class HBox(BaseElm):
+    observed = BaseElm.observed | {"gap", "bg_color"}
 
     def __init__(
         self,
@@ -40,19 +42,34 @@ class HBox(BaseElm):
     def __setitem__(self, key, value):
         self.children[key] = value
 
-    def _render(self, *args, **kwargs) -> pygame.Surface:
-        surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        if self.bg_color:
-            surface.fill(self.bg_color.value)
+    def _arrange(self) -> Layout:
         x = self.padding_left
+        height = 0
+        positions = []
         for element in self.children:
-            element.pos = (x, self.padding_top)
+            positions.append((x, self.padding_top))
             x += element.width + self.gap
+            height = max(height, element.height)
+        if self.children:
+            x -= self.gap
+        return Layout(
+            x + self.padding_right,
+            height + self.padding_top + self.padding_bottom,
+            positions,
+        )
+
+    def _render(self, *args, **kwargs) -> pygame.Surface:
+        layout = self.layout
+        surface = get_surface((self.width, self.height))
+        if self.bg_color:
+            surface.fill(self.bg_color.value)
+        for element, pos in zip(self.children, layout.positions):
             if not element.visible:
                 continue
             element_surface = element._render(*args, **kwargs)
             if element_surface:
-                surface.blit(element_surface, element.pos)
+                surface.blit(element_surface, pos)
+                release_surface(element_surface)
         if self.focus:
             pygame.draw.rect(
                 surface, Color.PRIMARY.value, (0, 0, self.width, self.height), 1
@@ -61,42 +78,27 @@ class HBox(BaseElm):
 
     def _render_overlay(self, *args, **kwargs) -> Surface | None:
         surface = None
-        x = self.padding_left
-        for element in self.children:
-            element.pos = (x, self.padding_top)
+        for element, pos in zip(self.children, self.layout.positions):
             element_surface = element._render_overlay(*args, **kwargs)
             if element_surface:
                 if surface is None:
                     # only create a surface if needed. Boosts performance.
-                    surface = pygame.Surface(
-                        (config.SCREEN_WIDTH, config.SCREEN_HEIGHT), pygame.SRCALPHA
-                    )
-                surface.blit(element_surface, element.pos)
-            x += element.width + self.gap
+                    surface = get_surface((config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+                surface.blit(element_surface, pos)
+                release_surface(element_surface)
         return surface
 
     @property
     def width(self):
         if self._width is not None:
             return self._width
-        if not self.children:
-            return self.padding_left + self.padding_right
-        return (
-            sum([element.width for element in self.children])
-            + (len(self.children) - 1) * self.gap
-            + self.padding_left
-            + self.padding_right
-        )
+        return self.layout.width
 
     @property
     def height(self):
         if self._height is not None:
             return self._height
-        return (
-            (max([element.height for element in self.children]) if self.children else 0)
-            + self.padding_top
-            + self.padding_bottom
-        )
+        return self.layout.height
 
     def render_debug(self) -> pygame.Surface:
         surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
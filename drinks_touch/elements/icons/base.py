@@ -2,9 +2,12 @@ import pygame
 
 from config import Color
 from elements.base_elm import BaseElm
+from surface_pool import get_surface
 
 
 class BaseIcon(BaseElm):
+    observed = BaseElm.observed | {"bg_color"}
+
     SIZE = 24
     COLOR = Color.PRIMARY
 
@@ -55,7 +58,7 @@ class BaseIcon(BaseElm):
         assert self.pos is not None
         width = self.width + self.padding_left + self.padding_right
         height = self.height + self.padding_top + self.padding_bottom
-        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface = get_surface((width, height))
         if self.bg_color:
             surface.fill(self.bg_color.value)
         self.draw(surface)
@@ -5,8 +5,8 @@ from pathlib import Path
 from random import random
 
 import pygame
-import cairosvg
 
+import svg_cache
 from config import Color
 from .base import BaseIcon
 
@@ -24,6 +24,7 @@ def load_and_scale_svg(filename, scale):
 
 
 class SvgIcon(BaseIcon):
+    observed = BaseIcon.observed | {"_path", "color", "image"}
 
     def __init__(
         self,
@@ -72,13 +73,7 @@ class SvgIcon(BaseIcon):
     def load_image(
         cls, path: str | Path, color: Color | None = None, width=None, height=None
     ):
-        png_bytes = cairosvg.svg2png(
-            url=str(path), output_width=width, output_height=height
-        )
-        image = pygame.image.load(io.BytesIO(png_bytes)).convert_alpha()
-        if color:
-            image.fill(color.value, special_flags=pygame.BLEND_RGBA_MIN)
-        return image
+        return svg_cache.rasterize(path, color, width, height).convert_alpha()
 
     def draw(self, surface):
         surface.blit(self.image, (self.padding_left, self.padding_top))
@@ -7,6 +7,8 @@ with contextlib.redirect_stdout(None):
 
 
 class Image(BaseElm):
+    observed = BaseElm.observed | {"img"}
+
     def __init__(self, src, size=None, scale_smooth=True, *args, **kwargs):
         self.src = src
         self.size = size
@@ -7,6 +7,8 @@ import pygame
 
 from config import Color, Font
 from elements.base_elm import BaseElm
+from fonts import get_font, render_text
+from surface_pool import get_surface
 from overlays.keyboard import KeyboardLayout
 from screens.screen_manager import ScreenManager
 
@@ -32,6 +34,7 @@ ALPHA_NUMERIC = NUMERIC + ALPHABET
 
 
 class InputField(BaseElm):
+    observed = BaseElm.observed | {"input_type", "text", "is_active"}
 
     def __init__(
         self,
@@ -88,11 +91,16 @@ class InputField(BaseElm):
             layout = KeyboardLayout.DEFAULT
         return {"enabled": True, "layout": layout}
 
+    @property
+    def animating(self) -> bool:
+        # blinking cursor
+        return self.is_active
+
     def tick(self, dt: float):
         self.is_active = ScreenManager.instance.active_object is self
 
     def _render(self, *args, **kwargs):
-        surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        surface = get_surface((self.width, self.height))
         pygame.draw.rect(
             surface, Color.NAVBAR_BACKGROUND.value, (0, 0, self.width, self.height)
         )
@@ -103,8 +111,8 @@ class InputField(BaseElm):
             (0, self.height - 1),
             (self.width, self.height - 1),
         )
-        font = pygame.font.Font(Font.SANS_SERIF.value, self.height - 10)
-        text_surface = font.render(self.text, 1, Color.PRIMARY.value)
+        font = get_font(Font.SANS_SERIF, self.height - 10)
+        text_surface = render_text(font, self.text, Color.PRIMARY.value)
         surface.blit(text_surface, (5, 0))
         if self.is_active:
             pygame.draw.rect(
@@ -130,7 +138,7 @@ class InputField(BaseElm):
         surface = pygame.Surface(
             (self.width, self.height + len(suggestions) * 20 + 5), pygame.SRCALPHA
         )
-        font = pygame.font.Font(Font.SANS_SERIF.value, 20)
+        font = get_font(Font.SANS_SERIF, 20)
 
         if suggestions:
             if len(suggestions) == 1 and suggestions[0] == self.text:
@@ -139,7 +147,7 @@ class InputField(BaseElm):
                 (self.width, len(suggestions) * self.height)
             )
             for i, suggestion in enumerate(suggestions):
-                suggestion_text = font.render(suggestion, 1, Color.GREY.value)
+                suggestion_text = render_text(font, suggestion, Color.GREY.value)
                 suggestion_surface.blit(suggestion_text, (5, i * 20))
             surface.blit(suggestion_surface, (0, self.height))
         surface.set_alpha(200)
@@ -1,8 +1,9 @@
-import functools
 import random
 from datetime import datetime
 
 import config
+from fonts import get_font, render_text, text_size
+from surface_pool import get_surface, release_surface
 from .base_elm import BaseElm
 
 import contextlib
@@ -14,6 +15,18 @@ pygame.font.init()
 
 
 class Label(BaseElm):
+    observed = BaseElm.observed | {
+        "text",
+        "flip_x",
+        "flip_y",
+        "font",
+        "color",
+        "bg_color",
+        "border_color",
+        "border_width",
+        "max_width",
+    }
+
     _font_cache = {}
 
     def __init__(
@@ -53,12 +66,12 @@ class Label(BaseElm):
         else:
             self.flip_x = False
             self.flip_y = False
-        self.font = Label.get_font(font, size)
+        self.font = get_font(font, size)
 
         super().__init__(children, height=height, width=width, *args, **kwargs)
 
         if self.auto_width or self.auto_height:
-            text, pos, area = self._build_text()
+            pos, area = self._text_area()
             if self.auto_width:
                 self.width = area.width + self.padding_left + self.padding_right
             if self.auto_height:
@@ -83,10 +96,9 @@ class Label(BaseElm):
             )
         )
 
-    @classmethod
-    @functools.cache
-    def get_font(cls, font: config.Font, size):
-        return pygame.font.Font(font.value, size)
+    @property
+    def animating(self) -> bool:
+        return bool(self.blink_frequency)
 
     def tick(self, dt: float):
         # TODO: Should be independent from frame rate
@@ -98,18 +110,22 @@ class Label(BaseElm):
             self.visible = not self.visible
 
     def _render(self, *args, **kwargs) -> pygame.Surface | None:
-        text, pos, area = self._build_text()
+        pos, area = self._text_area()
         if self.auto_width:
             self.width = area.width + self.padding_left + self.padding_right
         if self.auto_height:
             self.height = area.height + self.padding_top + self.padding_bottom
         bg = self._render_background(area)
-        surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        surface = get_surface((self.width, self.height))
         if bg:
             surface.blit(bg, (0, 0), area)
+            release_surface(bg)
+        text = render_text(self.font, self.text, self.color.value)
         surface.blit(text, (self.padding_left, self.padding_top), area)
         if self.flip_x or self.flip_y:
-            surface = pygame.transform.flip(surface, self.flip_x, self.flip_y)
+            flipped = pygame.transform.flip(surface, self.flip_x, self.flip_y)
+            release_surface(surface)
+            return flipped
         return surface
 
     def _render_background(self, area: pygame.Rect) -> pygame.Surface | None:
@@ -119,27 +135,30 @@ class Label(BaseElm):
             area.width + self.padding_left + self.padding_right,
             area.height + self.padding_top + self.padding_bottom,
         )
-        surface = pygame.Surface(size, pygame.SRCALPHA)
+        surface = get_surface(size)
         surface.fill(self.bg_color.value)
         return surface
 
-    def _build_text(self):
-        elm = self.font.render(self.text, 1, self.color.value)
+    def _text_area(self):
+        """
+        Position and visible area of the text. Measured without rasterizing it.
+        """
+        text_width, text_height = text_size(self.font, self.text)
         cutx = 0
         pos = self.pos
         if self.align_right:
             if self.max_width:
-                align_width = min(self.max_width, elm.get_width())
-                cutx = max(0, elm.get_width() - self.max_width)
+                align_width = min(self.max_width, text_width)
+                cutx = max(0, text_width - self.max_width)
             else:
-                align_width = elm.get_width()
+                align_width = text_width
             pos = (self.pos[0] - align_width, self.pos[1])
 
         area = pygame.Rect(
             cutx,
             0,
-            self.max_width if self.max_width else elm.get_width(),
-            elm.get_height(),
+            self.max_width if self.max_width else text_width,
+            text_height,
         )
 
-        return elm, pos, area
+        return pos, area
@@ -1,6 +1,7 @@
 import math
 
 import config
+from surface_pool import get_surface
 from .base_elm import BaseElm
 
 import contextlib
@@ -10,6 +11,8 @@ with contextlib.redirect_stdout(None):
 
 
 class Progress(BaseElm):
+    observed = BaseElm.observed | {"display_value", "is_running", "size", "color"}
+
     def __init__(
         self,
         children: list["BaseElm"] | None = None,
@@ -52,6 +55,10 @@ class Progress(BaseElm):
     def stop(self):
         self.is_running = False
 
+    @property
+    def animating(self) -> bool:
+        return self.is_running and self.on_elapsed is not None
+
     def tick(self, dt: float):
         if not self.is_running:
             return
@@ -64,7 +71,7 @@ class Progress(BaseElm):
             self.on_elapsed()
 
     def _render(self, *args, **kwargs) -> pygame.Surface:
-        surface = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
+        surface = get_surface((self.size, self.size))
         if self.is_running:
             extra_rounds = 0.75
             start = 0.5 * math.pi + self.display_value * math.pi * extra_rounds * 2
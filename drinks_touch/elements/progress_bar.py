@@ -5,9 +5,21 @@ import pygame.draw
 import config
 from config import Color
 from elements.base_elm import BaseElm
+from fonts import get_font, get_sys_font, render_text
+from surface_pool import get_surface, release_surface
 
 
 class ProgressBar(BaseElm):
+    observed = BaseElm.observed | {
+        "bar_height",
+        "text_height",
+        "label",
+        "text",
+        "label_height",
+        "color",
+        "percent",
+        "forever_bar_pos",
+    }
 
     def __init__(
         self,
@@ -44,8 +56,8 @@ class ProgressBar(BaseElm):
         self.color = Color.PRIMARY
         self.percent = None
         self.forever_bar_pos = 0
-        self.font = pygame.font.SysFont("sans serif", 25)
-        self.font_mono = pygame.font.Font(config.Font.MONOSPACE.value, 15)
+        self.font = get_sys_font("sans serif", 25)
+        self.font_mono = get_font(config.Font.MONOSPACE, 15)
 
     def calculate_hash(self):
         super_hash = super().calculate_hash()
@@ -104,6 +116,10 @@ class ProgressBar(BaseElm):
         self.color = Color.PRIMARY
         self.percent = None
 
+    @property
+    def animating(self) -> bool:
+        return not self.percent
+
     def tick(self, dt: float):
         super().tick(dt)
         self.t += dt
@@ -111,7 +127,7 @@ class ProgressBar(BaseElm):
             self.forever_bar_pos = int(self.t * 10)
 
     def _render(self, *args, **kwargs) -> pygame.Surface:
-        surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        surface = get_surface((self.width, self.height))
 
         x = 0
         y = 0
@@ -122,19 +138,21 @@ class ProgressBar(BaseElm):
             y += label.get_height()
         bar = self._render_bar()
         surface.blit(bar, (x, y))
+        release_surface(bar)
         y += self.bar_height
         if self.text:
             text = self._render_textbox()
             surface.blit(text, (x, y))
             y += text.get_height()
+            release_surface(text)
         return surface
 
     def _render_label(self) -> pygame.Surface:
-        label = self.font.render(self.label, 1, self.color.value)
+        label = render_text(self.font, self.label, self.color.value)
         return label
 
     def _render_textbox(self) -> pygame.Surface:
-        surface = pygame.Surface((self.width, self.text_height), pygame.SRCALPHA)
+        surface = get_surface((self.width, self.text_height))
         pygame.draw.rect(
             surface,
             self.color.value,
@@ -161,7 +179,7 @@ class ProgressBar(BaseElm):
         last_lines = lines[-self.max_lines :]
 
         for i, line in enumerate(last_lines):
-            text = self.font_mono.render(line, 1, config.Color.PRIMARY.value)
+            text = render_text(self.font_mono, line, config.Color.PRIMARY.value)
             surface.blit(
                 text,
                 (
@@ -172,7 +190,7 @@ class ProgressBar(BaseElm):
         return surface
 
     def _render_bar(self) -> pygame.Surface:
-        surface = pygame.Surface((self.width, self.bar_height), pygame.SRCALPHA)
+        surface = get_surface((self.width, self.bar_height))
         pygame.draw.rect(
             surface,
             self.color.value,
@@ -3,10 +3,12 @@ from pygame import Surface
 
 import config
 from config import Color
-from elements.base_elm import BaseElm
+from elements.base_elm import BaseElm, Layout
+from surface_pool import get_surface, release_surface
 
 
 class VBox(BaseElm):
+    observed = BaseElm.observed | {"gap"}
 
     def __init__(
         self,
@@ -30,17 +32,32 @@ class VBox(BaseElm):
         self.pos = pos
         self.gap = gap
 
-    def _render(self, *args, **kwargs) -> pygame.Surface:
-        surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+    def _arrange(self) -> Layout:
         y = self.padding_top
+        width = 0
+        positions = []
         for element in self.children:
-            element.pos = (self.padding_left, y)
+            positions.append((self.padding_left, y))
             y += element.height + self.gap
+            width = max(width, element.width)
+        if self.children:
+            y -= self.gap
+        return Layout(
+            width + self.padding_left + self.padding_right,
+            y + self.padding_bottom,
+            positions,
+        )
+
+    def _render(self, *args, **kwargs) -> pygame.Surface:
+        layout = self.layout
+        surface = get_surface((self.width, self.height))
+        for element, pos in zip(self.children, layout.positions):
             if not element.visible:
                 continue
             element_surface = element._render(*args, **kwargs)
             if element_surface:
-                surface.blit(element_surface, element.pos)
+                surface.blit(element_surface, pos)
+                release_surface(element_surface)
         if self.focus:
             pygame.draw.rect(
                 surface, Color.PRIMARY.value, (0, 0, self.width, self.height), 1
@@ -49,41 +66,26 @@ class VBox(BaseElm):
 
     def _render_overlay(self, *args, **kwargs) -> Surface | None:
         surface = None
-        y = self.padding_top
-        for element in self.children:
-            element.pos = (self.padding_left, y)
+        for element, pos in zip(self.children, self.layout.positions):
             element_surface = element._render_overlay(*args, **kwargs)
             if element_surface:
                 if surface is None:
-                    surface = pygame.Surface(
-                        (config.SCREEN_WIDTH, config.SCREEN_HEIGHT), pygame.SRCALPHA
-                    )
-                surface.blit(element_surface, element.pos)
-            y += element.height + self.gap
+                    surface = get_surface((config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+                surface.blit(element_surface, pos)
+                release_surface(element_surface)
         return surface
 
     @property
     def width(self):
         if self._width is not None:
             return self._width
-        return (
-            (max([element.width for element in self.children]) if self.children else 0)
-            + self.padding_left
-            + self.padding_right
-        )
+        return self.layout.width
 
     @property
     def height(self):
         if self._height is not None:
             return self._height
-        if not self.children:
-            return self.padding_top + self.padding_bottom
-        return (
-            sum([element.height for element in self.children])
-            + (len(self.children) - 1) * self.gap
-            + self.padding_top
-            + self.padding_bottom
-        )
+        return self.layout.height
 
     def render_debug(self) -> pygame.Surface:
         surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
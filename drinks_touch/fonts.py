@@ -0,0 +1,96 @@
+import contextlib
+import functools
+from collections import OrderedDict
+
+from pygame import Surface
+
+from config import Font
+
+with contextlib.redirect_stdout(None):
+    import pygame
+
+pygame.font.init()
+
+Color = tuple[int, int, int] | tuple[int, int, int, int]
+
+
+@functools.cache
+def get_font(font: Font | None, size: int) -> pygame.font.Font:
+    """
+    Loads every font only once. `None` is pygame's default font.
+    """
+    return pygame.font.Font(font.value if font else None, int(size))
+
+
+@functools.cache
+def get_sys_font(name: str, size: int) -> pygame.font.Font:
+    return pygame.font.SysFont(name, int(size))
+
+
+def text_size(font: pygame.font.Font, text: str) -> tuple[int, int]:
+    """
+    Size of the surface `render_text` would return, without rasterizing the text.
+    """
+    return font.size(text)
+
+
+class TextCache:
+    """
+    LRU cache of rasterized text. The returned surfaces are shared,
+    so they must only be blitted, never drawn on.
+    """
+
+    MAX_ENTRIES = 512
+
+    def __init__(self):
+        self._surfaces: OrderedDict[tuple, Surface] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(
+        self,
+        font: pygame.font.Font,
+        text: str,
+        color: Color,
+        antialias: bool = True,
+        background: Color | None = None,
+    ) -> Surface:
+        key = (font, text, color, antialias, background)
+        if (surface := self._surfaces.get(key)) is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color, background)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.MAX_ENTRIES:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._surfaces),
+        }
+
+
+_text_cache = TextCache()
+
+
+def render_text(
+    font: pygame.font.Font,
+    text: str,
+    color: Color,
+    antialias: bool = True,
+    background: Color | None = None,
+) -> Surface:
+    """
+    Cached `font.render()`. Don't draw on the returned surface.
+    """
+    return _text_cache.render(font, text, color, antialias, background)
+
+
+def text_cache_stats() -> dict[str, int]:
+    return _text_cache.stats
@@ -0,0 +1,124 @@
+import contextlib
+import logging
+import time
+
+import config
+
+with contextlib.redirect_stdout(None):
+    import pygame
+
+logger = logging.getLogger(__name__)
+
+# Posted by background threads to wake up the main loop, e.g. when a task finished
+WAKE_EVENT = pygame.event.custom_type()
+
+INPUT_EVENTS = {
+    pygame.KEYDOWN,
+    pygame.KEYUP,
+    pygame.TEXTINPUT,
+    pygame.MOUSEBUTTONDOWN,
+    pygame.MOUSEBUTTONUP,
+    pygame.MOUSEMOTION,
+    pygame.MOUSEWHEEL,
+    pygame.FINGERDOWN,
+    pygame.FINGERUP,
+    pygame.FINGERMOTION,
+}
+
+# Events that only wake up the display, but aren't passed on. Otherwise,
+# touching the black screen would click on whatever button is hidden below.
+# Key events are passed on, so that a barcode scan is processed right away.
+POINTER_EVENTS = INPUT_EVENTS - {pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT}
+
+
+def wake(display: bool = False):
+    """
+    Makes the main loop render the next frame immediately.
+    Pass `display=True` to also wake up the display, e.g. for a barcode scan.
+    Safe to call from any thread.
+    """
+    with contextlib.suppress(pygame.error):
+        pygame.event.post(pygame.event.Event(WAKE_EVENT, display=display))
+
+
+class FrameScheduler:
+    """
+    Decides how long the main loop waits before the next frame.
+
+    While something on the screen is animating, frames are rendered at `fps`.
+    Otherwise, the loop blocks until an event arrives, but at least `idle_fps`
+    frames are rendered per second, so that ticks and changes made by background
+    threads are still picked up.
+    After `sleep_timeout` seconds without input, the display goes to sleep
+    until it is touched or something is scanned.
+    """
+
+    def __init__(
+        self,
+        fps: int = config.FPS,
+        idle_fps: int = config.IDLE_FPS,
+        sleep_timeout: int = config.DISPLAY_SLEEP_TIMEOUT,
+    ):
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.sleep_timeout = sleep_timeout
+        self.clock = pygame.time.Clock()
+        self.ts_last_input = self._now()
+        self.idle = False
+        self.asleep = False
+
+    def wait(self, animating: bool, sleep_allowed: bool = True) -> tuple[float, list]:
+        """
+        Blocks until the next frame is due.
+        Returns the time since the last frame in seconds and the pending events.
+        """
+        self.idle = not animating and not self.asleep
+        if self.asleep:
+            events = self._wait_for_event(1000)
+        elif self.idle:
+            events = self._wait_for_event(1000 // self.idle_fps)
+        else:
+            events = self._get_events()
+        dt = self._tick(0 if self.idle or self.asleep else self.fps)
+
+        woken = any(
+            e.type in INPUT_EVENTS or e.type == WAKE_EVENT and e.display for e in events
+        )
+        events = [e for e in events if e.type != WAKE_EVENT]
+        if woken:
+            self.ts_last_input = self._now()
+            if self.asleep:
+                logger.info("Waking up the display")
+                self.asleep = False
+                events = [e for e in events if e.type not in POINTER_EVENTS]
+        elif (
+            sleep_allowed
+            and self.sleep_timeout
+            and not self.asleep
+            and self._now() - self.ts_last_input > self.sleep_timeout
+        ):
+            logger.info(
+                "No input for %d seconds, display goes to sleep", self.sleep_timeout
+            )
+            self.asleep = True
+        return dt, events
+
+    # Overridden by the benchmark, which doesn't wait
+
+    def _wait_for_event(self, timeout_ms: int) -> list:
+        event = pygame.event.wait(timeout_ms)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    def _get_events(self) -> list:
+        return pygame.event.get()
+
+    def _tick(self, fps: int) -> float:
+        return self.clock.tick(fps) / 1000.0
+
+    def _now(self) -> float:
+        return time.monotonic()
+
+    def get_fps(self) -> float:
+        return self.clock.get_fps()
@@ -0,0 +1,149 @@
+"""
+Timing of the main loop.
+
+Every frame records how long its phases (events, tick, render, flip) took.
+Additionally, the render time of every screen and element class is recorded
+whenever it is re-rendered. The last samples are kept, so that percentiles can
+be calculated. They are shown at debug level 2 and can be written to a file
+by sending SIGUSR2 to the process, see debug.py.
+"""
+
+import contextlib
+import heapq
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class RollingHistogram:
+    """
+    Keeps the last `size` samples
+    """
+
+    def __init__(self, size: int):
+        self.samples: deque[float] = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+
+    def percentiles(self, *ps: float) -> list[float]:
+        if not self.samples:
+            return [0.0] * len(ps)
+        ordered = sorted(self.samples)
+        return [ordered[min(len(ordered) - 1, int(len(ordered) * p))] for p in ps]
+
+    @property
+    def max(self) -> float:
+        return max(self.samples, default=0.0)
+
+
+class FrameStats:
+    PHASES = ("events", "tick", "render", "flip")
+    # 10 seconds at full frame rate
+    SAMPLES = 600
+    WORST_FRAMES = 10
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets all samples, e.g. between two benchmarks
+        """
+        self.phases = {phase: RollingHistogram(self.SAMPLES) for phase in self.PHASES}
+        self.frames = RollingHistogram(self.SAMPLES)
+        self.screens: dict[str, RollingHistogram] = {}
+        self.elements: dict[str, RollingHistogram] = {}
+        # Heap of (duration, timestamp, screen, phases) of the slowest frames
+        self.worst_frames: list[tuple[float, str, str, dict[str, float]]] = []
+        self._frame: dict[str, float] = {}
+        # Name of the active screen, shown in the list of the slowest frames
+        self.screen = ""
+
+    @contextlib.contextmanager
+    def measure(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._frame[phase] = (
+                self._frame.get(phase, 0.0) + time.perf_counter() - start
+            )
+
+    def add_screen(self, name: str, duration: float):
+        self._add(self.screens, name, duration)
+
+    def add_element(self, name: str, duration: float):
+        self._add(self.elements, name, duration)
+
+    def _add(self, histograms: dict[str, RollingHistogram], name: str, value: float):
+        if (histogram := histograms.get(name)) is None:
+            histogram = histograms[name] = RollingHistogram(self.SAMPLES)
+        histogram.add(value)
+
+    def end_frame(self):
+        frame = self._frame
+        self._frame = {}
+        for phase, duration in frame.items():
+            self.phases[phase].add(duration)
+        total = sum(frame.values())
+        self.frames.add(total)
+        entry = (total, datetime.now().isoformat(), self.screen, frame)
+        if len(self.worst_frames) < self.WORST_FRAMES:
+            heapq.heappush(self.worst_frames, entry)
+        elif total > self.worst_frames[0][0]:
+            heapq.heapreplace(self.worst_frames, entry)
+
+    @staticmethod
+    def _format(name: str, histogram: RollingHistogram) -> str:
+        p50, p95, p99 = histogram.percentiles(0.5, 0.95, 0.99)
+        return (
+            f"{name[:24]:24} {p50 * 1000:6.1f} {p95 * 1000:6.1f} "
+            f"{p99 * 1000:6.1f} {histogram.max * 1000:6.1f}"
+        )
+
+    def _top(self, histograms: dict[str, RollingHistogram], n: int | None):
+        ranked = sorted(
+            histograms.items(),
+            key=lambda item: item[1].percentiles(0.95)[0],
+            reverse=True,
+        )
+        return [self._format(name, histogram) for name, histogram in ranked[:n]]
+
+    def summary(self, top: int | None = None) -> list[str]:
+        """
+        Lines with p50, p95, p99 and max in milliseconds. Screens and elements
+        are sorted by p95. `top` limits how many of them are listed.
+        """
+        header = f"{'':24} {'p50':>6} {'p95':>6} {'p99':>6} {'max':>6}"
+        lines = [header, self._format("frame", self.frames)]
+        lines += [self._format(p, h) for p, h in self.phases.items()]
+        lines += ["", "Screens (render)", *self._top(self.screens, top)]
+        lines += ["", "Elements (render, incl. children)"]
+        lines += self._top(self.elements, top)
+        return lines
+
+    def dump(self, path: Path | None = None) -> Path:
+        if path is None:
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            path = config.FRAME_STATS_PATH / f"frame-stats_{timestamp}.txt"
+        lines = self.summary()
+        lines += ["", "Slowest frames"]
+        for total, timestamp, screen, phases in sorted(self.worst_frames)[::-1]:
+            details = ", ".join(f"{p} {d * 1000:.1f}" for p, d in phases.items())
+            lines.append(f"{timestamp} {total * 1000:7.1f} ms  {screen} ({details})")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n".join(lines) + "\n")
+        logger.info("Frame stats written to %s", path)
+        return path
+
+
+frame_stats = FrameStats()
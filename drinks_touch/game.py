@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
 
+# Must be the first import, to measure how long the other imports take
+import boot_profile
+
 import contextlib
 import locale
 import logging
@@ -13,14 +16,23 @@ from alembic.runtime.migration import MigrationContext
 from alembic.script import ScriptDirectory
 
 import config
+import debug
 from database.storage import engine
+from frame_scheduler import FrameScheduler
+from frame_stats import frame_stats
 from overlays import MouseOverlay, BaseOverlay
 from overlays.background import BackgroundOverlay
 from overlays.keyboard import KeyboardOverlay
+from overlays.pending_purchases import PendingPurchasesOverlay
+from change_feed import change_feed
+from local_replica import replica
+from periodic_tasks import periodic_tasks
+from purchase_journal import drainer
 from screens.message_screen import MessageScreen
 from screens.screen_manager import ScreenManager
 
 from screens.tasks_screen import TasksScreen
+from screens.wait_scan import WaitScanScreen
 from tasks.run_cmd import UpdateGitRemoteTask
 import sentry_sdk
 
@@ -60,11 +72,14 @@ def handle_events(events, t: int, dt: float, overlays: list[BaseOverlay]) -> boo
 
 # Rendering #
 def main():
+    boot_profile.mark("imports")
+    debug.listen()
     locale.setlocale(locale.LC_ALL, "de_DE.UTF-8")
 
     screen_manager = ScreenManager()
 
     screen_manager.set_default()
+    boot_profile.mark("screen manager")
 
     alembic_script = ScriptDirectory(Path(__file__).parent / "alembic")
     with engine.begin() as conn:
@@ -144,10 +159,21 @@ def main():
                 screen_manager.set_active(TasksScreen())
         else:
             screen_manager.set_active(TasksScreen())
+    boot_profile.mark("database and git checks")
+
+    # Purchases that couldn't be saved before the last shutdown are saved now
+    drainer.start()
+    change_feed.subscribe(replica.on_change)
+    change_feed.subscribe(screen_manager.on_change)
+    replica.subscribe(screen_manager.on_change)
+    replica.start()
+    change_feed.start()
+    periodic_tasks.start()
 
     overlays = [
         KeyboardOverlay(screen_manager),
         BackgroundOverlay(screen_manager),
+        PendingPurchasesOverlay(screen_manager),
         MouseOverlay(screen_manager),
     ]
 
@@ -155,26 +181,59 @@ def main():
     pygame.mixer.pre_init(48000, buffer=2048)
     pygame.mixer.init()
 
-    clock = pygame.time.Clock()
+    scheduler = FrameScheduler()
     t = 0
     done = False
+    animating = True
+    first_frame = True
+    boot_profile.mark("overlays and sound")
 
     while not done:
-        dt = clock.tick(config.FPS) / 1000.0
+        dt, events = scheduler.wait(animating, screen_manager.display_sleep)
         t += dt
-        fps = clock.get_fps()
-
-        done = handle_events(pygame.event.get(), t, dt, overlays)
-
-        screen_manager.tick(dt)
-        for overlay in overlays:
-            overlay.tick(dt)
-
-        screen_manager.render(fps)
-        for overlay in overlays:
-            overlay.render()
-
-        pygame.display.flip()
+        fps = scheduler.get_fps()
+
+        with frame_stats.measure("events"):
+            done = handle_events(events, t, dt, overlays)
+
+        with frame_stats.measure("tick"):
+            screen_manager.tick(dt)
+            for overlay in overlays:
+                overlay.tick(dt)
+
+        compositor = screen_manager.compositor
+        if scheduler.asleep:
+            screen_manager.render_blank()
+            compositor.present()
+            frame_stats.end_frame()
+            continue
+
+        with frame_stats.measure("render"):
+            for overlay in overlays:
+                compositor.damage(*overlay.damaged_rects())
+            screen_manager.render(fps)
+            for overlay in overlays:
+                overlay.render()
+                compositor.damage(*overlay.drawn_rects)
+
+        with frame_stats.measure("flip"):
+            compositor.present()
+        frame_stats.end_frame()
+
+        if first_frame:
+            boot_profile.mark("first frame")
+            first_frame = False
+        if isinstance(screen_manager.get_active(), WaitScanScreen):
+            # Only the first call has an effect
+            boot_profile.mark("startup tasks")
+            boot_profile.report()
+
+        # Stay at full frame rate as long as anything changed on the screen
+        animating = (
+            compositor.updated_area > 0
+            or screen_manager.animating
+            or any(overlay.animating for overlay in overlays)
+        )
 
     return 0
 
@@ -0,0 +1,326 @@
+"""
+Local copy of the accounts and drinks.
+
+Scanning a barcode and choosing a name happen all the time and used to query
+Postgres every time. Instead, they are looked up in a copy of the account and
+drink tables, which is kept in memory and stored on the disk, so that it is
+available right after a restart, even if the database isn't reachable.
+
+A background thread fetches the rows that changed since the last update,
+using the updated_at column that is set by a trigger. It runs whenever the
+change feed reports a change and every few minutes otherwise. The ids of all rows are
+fetched as well, to notice deleted rows, together with the balances of the
+accounts. These don't change updated_at, but the screens show them without
+waiting for the database.
+
+Lookups return detached ORM objects. They aren't part of a session, so
+committing doesn't expire them and the following screens can read their
+columns without querying the database. To change an object, load it into the
+session with `Session().get()` first. If the replica wasn't loaded yet or
+doesn't know a barcode, the screens fall back to querying Postgres.
+"""
+
+import json
+import logging
+import threading
+import uuid
+from collections.abc import Callable
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
+
+import config
+from change_feed import Change, RESET
+from database.models import Account, Drink
+from database.storage import Session, with_db
+
+logger = logging.getLogger(__name__)
+
+# Changes of the balance don't change updated_at, so it would be outdated
+EXCLUDED_COLUMNS = {Account: {"balance"}, Drink: set()}
+
+
+def _columns(model) -> list:
+    return [
+        column
+        for column in model.__table__.columns
+        if column.name not in EXCLUDED_COLUMNS[model]
+    ]
+
+
+def _encode(value):
+    if isinstance(value, (Decimal, datetime, date, uuid.UUID)):
+        return str(value)
+    return value
+
+
+def _decode(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type in (datetime, date):
+        return python_type.fromisoformat(value)
+    if python_type in (Decimal, uuid.UUID):
+        return python_type(value)
+    return value
+
+
+class Balances(NamedTuple):
+    # Account id -> balance in Postgres, without the pending purchases
+    by_id: dict[int, Decimal]
+    # Purchases drained later might be missing, see Account.known_balance
+    read_at: datetime | None
+
+
+class LocalReplica:
+    # Changes are usually noticed earlier, see `on_change()`
+    REFRESH_INTERVAL = 300
+    # Rows that were changed in a transaction that committed after the last
+    # update have an older updated_at. They are found by looking back a bit.
+    OVERLAP = timedelta(minutes=5)
+
+    def __init__(self, path: Path):
+        self.path = path
+        # Model -> id -> column values
+        self.rows: dict[type, dict[int, dict]] = {Account: {}, Drink: {}}
+        self.accounts_by_id_card: dict[str, int] = {}
+        self.drinks_by_ean: dict[str, int] = {}
+        # Replaced at once, so that a balance is never read with the wrong time
+        self.balances = Balances({}, None)
+        self.updated_at: datetime | None = None
+        self.callbacks: list[Callable[[Change], None]] = []
+        self.event = threading.Event()
+        self.thread: threading.Thread | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.updated_at is not None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.load()
+        self.thread = threading.Thread(target=self._run, name="LocalReplica")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def notify(self):
+        """
+        Updates the replica now instead of waiting for the next interval
+        """
+        self.event.set()
+
+    def subscribe(self, callback: Callable[[Change], None]):
+        """
+        The callback is called in the thread of the replica when the balance
+        of an account or a drink changed, after the replica was updated
+        """
+        self.callbacks.append(callback)
+
+    def on_change(self, change: Change):
+        """
+        Subscribed to the change feed
+        """
+        if change.table in ("account", "drink", "tx") or change is RESET:
+            self.notify()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.warning("Couldn't update the local replica", exc_info=True)
+                Session.remove()
+            self.event.wait(self.REFRESH_INTERVAL)
+            self.event.clear()
+
+    @with_db
+    def refresh(self):
+        session = Session()
+        since = self.updated_at - self.OVERLAP if self.updated_at else None
+        rows = {}
+        newest = [self.updated_at] if self.updated_at else []
+        for model in (Account, Drink):
+            columns = _columns(model)
+            query = select(*columns)
+            if since is not None:
+                query = query.where(model.updated_at > since)
+            changed = [dict(row._mapping) for row in session.execute(query)]
+            if model is Account:
+                # Before the query, so that everything drained earlier is included
+                read_at = datetime.now(timezone.utc)
+                query = select(Account.id, Account.stored_balance)
+                balances = Balances(dict(session.execute(query).all()), read_at)
+                ids = set(balances.by_id)
+            else:
+                ids = set(session.scalars(select(model.id)))
+            model_rows = {
+                id_: row for id_, row in self.rows[model].items() if id_ in ids
+            }
+            model_rows.update((row["id"], row) for row in changed)
+            rows[model] = model_rows
+            newest += [row["updated_at"] for row in changed]
+        # Nothing to compare with before the first update
+        changed_balances = set()
+        changed_drinks = []
+        if self.ready:
+            changed_drinks = [
+                row
+                for id_, row in rows[Drink].items()
+                if self.rows[Drink].get(id_) != row
+            ]
+            changed_balances = {
+                id_
+                for id_, balance in balances.by_id.items()
+                if self.balances.by_id.get(id_) != balance
+            }
+            if self.balances.read_at is not None:
+                # Imported here, because the journal imports the replica
+                from purchase_journal import purchase_journal
+
+                # Their purchases aren't counted as pending anymore
+                changed_balances |= purchase_journal.drained_account_ids(
+                    self.balances.read_at, read_at
+                )
+        if rows == self.rows and balances.by_id == self.balances.by_id and self.ready:
+            # Nothing to save, but the purchases drained until now are included
+            self.balances = balances
+        else:
+            self._set(rows, balances, max(newest, default=None))
+            self.save()
+            logger.info(
+                "Local replica updated: %d accounts, %d drinks",
+                len(rows[Account]),
+                len(rows[Drink]),
+            )
+        for id_ in changed_balances:
+            self._dispatch(Change("account", "UPDATE", id=id_))
+        for row in changed_drinks:
+            self._dispatch(Change("drink", "UPDATE", id=row["id"], ean=row["ean"]))
+
+    def _dispatch(self, change: Change):
+        for callback in self.callbacks:
+            try:
+                callback(change)
+            except Exception:
+                logger.exception("Couldn't handle %s", change)
+
+    def _set(
+        self,
+        rows: dict[type, dict[int, dict]],
+        balances: Balances,
+        updated_at: datetime | None,
+    ):
+        # Replaced at once, the lookups run in another thread
+        self.accounts_by_id_card = {
+            row["id_card"]: id_ for id_, row in rows[Account].items() if row["id_card"]
+        }
+        self.drinks_by_ean = {
+            row["ean"]: id_ for id_, row in rows[Drink].items() if row["ean"]
+        }
+        self.rows = rows
+        self.balances = balances
+        self.updated_at = updated_at or datetime.now().astimezone()
+
+    def load(self):
+        try:
+            data = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return
+        except ValueError:
+            logger.warning("Ignoring broken local replica %s", self.path)
+            return
+        rows = {}
+        for model in (Account, Drink):
+            columns = _columns(model)
+            rows[model] = {}
+            for values in data[model.__tablename__]:
+                row = {
+                    column.name: _decode(column, value)
+                    for column, value in zip(columns, values)
+                }
+                rows[model][row["id"]] = row
+        # Missing in files written before the balances were copied
+        read_at = data.get("balances_read_at")
+        balances = Balances(
+            {
+                int(id_): Decimal(balance)
+                for id_, balance in data.get("balances", {}).items()
+            },
+            datetime.fromisoformat(read_at) if read_at else None,
+        )
+        self._set(rows, balances, datetime.fromisoformat(data["updated_at"]))
+
+    def save(self):
+        data = {"updated_at": self.updated_at.isoformat()}
+        for model, model_rows in self.rows.items():
+            columns = _columns(model)
+            data[model.__tablename__] = [
+                [_encode(row[column.name]) for column in columns]
+                for row in model_rows.values()
+            ]
+        data["balances"] = {
+            str(id_): str(balance) for id_, balance in self.balances.by_id.items()
+        }
+        if self.balances.read_at is not None:
+            data["balances_read_at"] = self.balances.read_at.isoformat()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data))
+        tmp_path.replace(self.path)
+
+    @staticmethod
+    def _detached(model, row: dict):
+        """
+        Returns the row as an ORM object that isn't attached to a session
+        """
+        instance = model(**row)
+        make_transient_to_detached(instance)
+        return instance
+
+    def account_by_id_card(self, id_card: str) -> Account | None:
+        if (id_ := self.accounts_by_id_card.get(id_card)) is None:
+            return None
+        return self._detached(Account, self.rows[Account][id_])
+
+    def drink_by_ean(self, ean: str) -> Drink | None:
+        if (id_ := self.drinks_by_ean.get(ean)) is None:
+            return None
+        return self._detached(Drink, self.rows[Drink][id_])
+
+    def balance(self, account_id: int) -> tuple[Decimal, datetime | None] | None:
+        """
+        The last known balance in Postgres, without the pending purchases,
+        and when it was read
+        """
+        balances = self.balances
+        if account_id not in balances.by_id:
+            return None
+        return balances.by_id[account_id], balances.read_at
+
+    def first_chars(self) -> list[tuple[str | None, int]]:
+        """
+        Like `SELECT upper(substr(name, 1, 1)), count(*) ... GROUP BY 1`
+        """
+        counts: dict[str | None, int] = {}
+        for row in self.rows[Account].values():
+            char = row["name"][:1].upper() if row["name"] else None
+            counts[char] = counts.get(char, 0) + 1
+        return sorted(counts.items(), key=lambda item: (item[0] is None, item[0]))
+
+    def enabled_accounts_starting_with(self, prefix: str) -> list[Account]:
+        prefix = prefix.lower()
+        rows = [
+            row
+            for row in self.rows[Account].values()
+            if row["enabled"] and (row["name"] or "").lower().startswith(prefix)
+        ]
+        rows.sort(key=lambda row: (row["name"].casefold(), row["name"]))
+        return [self._detached(Account, row) for row in rows]
+
+
+replica = LocalReplica(config.LOCAL_REPLICA_PATH)
@@ -10,8 +10,9 @@ from email.header import Header
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.utils import formatdate, make_msgid
-from premailer import transform
-from sqlalchemy import select
+from collections import defaultdict
+
+from sqlalchemy import func, select
 
 import config
 from database.models import Tx
@@ -44,6 +45,9 @@ def send_notification(
     """
 
     def f():
+        # Only imported if needed, because importing it takes a while
+        from premailer import transform
+
         msg = MIMEMultipart("alternative")
 
         plain = MIMEText(content_text, "plain", _charset="utf-8")
@@ -82,20 +86,32 @@ def send_drink(account: Account, drink_name: str):
         account.summary_email_notification_setting or ""
     ):
         return
+    # Called on the screen, so the balance is read in the background
+    BackgroundOverlay.run(
+        functools.partial(
+            _send_drink, account.id, account.email, account.ldap_id, drink_name
+        ),
+        label="Sending email",
+    )
+
+
+@with_db
+def _send_drink(account_id: int, email: str, uid: str, drink_name: str):
     context = {
         "drink_name": drink_name,
-        "uid": account.ldap_id,
-        "balance": account.balance,
+        "uid": uid,
+        "balance": Session().get(Account, account_id).balance,
     }
     content_text = render_jinja_template("instant.txt", **context)
     content_html = render_jinja_template("instant.html", **context)
 
     send_notification(
-        account.email,
+        email,
         "Getränk getrunken",
         content_text,
         content_html,
-        account.ldap_id,
+        uid,
+        blocking=True,
     )
 
 
@@ -126,6 +142,29 @@ def get_recent_transactions(account: Account) -> list[Tx]:
     return transactions
 
 
+@with_db
+def get_recent_transactions_of_accounts(
+    accounts: list[Account],
+) -> dict[int, list[Tx]]:
+    """
+    Like `get_recent_transactions`, but for many accounts in a single query
+    """
+    query = (
+        select(Tx)
+        .join(Account, Tx.account_id == Account.id)
+        .where(
+            Account.id.in_([account.id for account in accounts]),
+            Tx.created_at
+            >= func.coalesce(Account.last_summary_email_sent_at, datetime.min),
+        )
+        .order_by(Tx.created_at)
+    )
+    transactions = defaultdict(list)
+    for tx in Session().execute(query).scalars():
+        transactions[tx.account_id].append(tx)
+    return transactions
+
+
 def render_jinja_template(
     file_name, template_loc="drinks_touch/notifications/templates", **context
 ):
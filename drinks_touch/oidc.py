@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from datetime import datetime, timedelta
 from urllib.parse import urlparse
 
@@ -6,6 +7,11 @@ import requests
 
 
 class KeycloakAdmin:
+    # Users or events per request
+    PAGE_SIZE = 200
+    # User events that change the synced attributes of a user
+    USER_EVENT_TYPES = ["REGISTER", "UPDATE_PROFILE", "UPDATE_EMAIL", "DELETE_ACCOUNT"]
+
     def __init__(
         self, client_id=None, client_secret=None, oidc_discovery_url=None, timeout=10
     ):
@@ -57,10 +63,86 @@ class KeycloakAdmin:
             - timedelta(seconds=config.OIDC_REFRESH_BUFFER)
         )
 
-    def get_user_list(self, **kwargs):
-        return self._admin_request("/users", **kwargs)
+    def get_user_list(self, first: int | None = None, max: int | None = None, **kwargs):
+        """
+        Keycloak returns at most 100 users if `max` isn't given
+        """
+        params = {"first": first, "max": max}
+        return self._admin_request("/users", params=params, **kwargs)
+
+    def get_user_count(self) -> int:
+        return self._admin_request("/users/count")
+
+    def get_user(self, user_id: str) -> dict | None:
+        """
+        None if the user doesn't exist (anymore)
+        """
+        try:
+            return self._admin_request(f"/users/{user_id}")
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
 
-    def _admin_request(self, path: str, stream: bool = False):
+    def iter_user_pages(self, page_size: int | None = None) -> Iterator[list[dict]]:
+        """
+        All users, one page at a time, so only one page is kept in memory
+        """
+        return self._iter_pages("/users", {}, page_size)
+
+    def events_enabled(self) -> bool:
+        """
+        Whether both user and admin events are recorded by the realm
+        """
+        events_config = self._admin_request("/events/config")
+        return bool(
+            events_config.get("eventsEnabled")
+            and events_config.get("adminEventsEnabled")
+        )
+
+    def changed_user_ids(self, since: datetime) -> set[str]:
+        """
+        The users that were created, changed or deleted since then, according
+        to the events of the realm. Changes that don't cause an event, e.g.
+        in a federated LDAP, are missing.
+        """
+        # dateFrom only takes a day, so the events are filtered by their time
+        params = {"dateFrom": since.date().isoformat()}
+        since_ms = since.timestamp() * 1000
+        user_ids = set()
+        for page in self._iter_pages(
+            "/admin-events", {**params, "resourceTypes": "USER"}
+        ):
+            for event in page:
+                parts = event.get("resourcePath", "").split("/")
+                if event["time"] >= since_ms and len(parts) > 1 and parts[0] == "users":
+                    user_ids.add(parts[1])
+        for page in self._iter_pages(
+            "/events", {**params, "type": self.USER_EVENT_TYPES}
+        ):
+            for event in page:
+                if event["time"] >= since_ms and event.get("userId"):
+                    user_ids.add(event["userId"])
+        return user_ids
+
+    def _iter_pages(
+        self, path: str, params: dict, page_size: int | None = None
+    ) -> Iterator[list[dict]]:
+        page_size = page_size or self.PAGE_SIZE
+        first = 0
+        while True:
+            page = self._admin_request(
+                path, params={**params, "first": first, "max": page_size}
+            )
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            first += len(page)
+
+    def _admin_request(
+        self, path: str, stream: bool = False, params: dict | None = None
+    ):
         assert path.startswith("/"), "Path must start with /"
         if self.access_token is None or self.access_token_expires_at < datetime.now():
             self.login()
@@ -68,6 +150,7 @@ class KeycloakAdmin:
         res = requests.get(
             self.admin_base_url + path,
             headers={"Authorization": f"Bearer {self.access_token}"},
+            params=params,
             stream=stream,
             timeout=self.timeout,
         )
@@ -1,8 +1,9 @@
 import threading
 
-import pygame
-
 import config
+from fonts import get_font, render_text
+from frame_scheduler import wake
+from surface_pool import get_surface, release_surface
 
 from screens.screen_manager import ScreenManager
 from .base import BaseOverlay
@@ -24,16 +25,22 @@ class BackgroundOverlay(BaseOverlay):
             self._render_thread_label(label, i)
 
     def _render_thread_label(self, label: str, idx: int):
-        font = pygame.font.Font(config.Font.SANS_SERIF.value, 16)
-        text_surface = font.render(label, True, config.Color.PRIMARY.value)
+        font = get_font(config.Font.SANS_SERIF, 16)
+        text_surface = render_text(font, label, config.Color.PRIMARY.value)
         text_rect = text_surface.get_rect()
 
-        surface = pygame.Surface((text_rect.width, text_rect.height), pygame.SRCALPHA)
+        surface = get_surface(text_rect.size)
         surface.fill((0, 0, 0, 200))
         surface.blit(text_surface, (0, 0))
         text_rect.y = (text_rect.height + 3) * idx
         text_rect.x = config.SCREEN_WIDTH - text_rect.width
-        self.screen.blit(surface, text_rect)
+        self.drawn_rects.append(self.screen.blit(surface, text_rect))
+        release_surface(surface)
+
+    @property
+    def animating(self) -> bool:
+        # spinner
+        return bool(BackgroundOverlay.threads)
 
     def reset(self):
         self.t = 0
@@ -48,7 +55,13 @@ class BackgroundOverlay(BaseOverlay):
 
     @classmethod
     def run(cls, function: callable, label: str = ""):
-        thread = threading.Thread(target=function)
+        def target():
+            try:
+                function()
+            finally:
+                wake()
+
+        thread = threading.Thread(target=target)
         BackgroundOverlay.threads.append((thread, label))
         thread.daemon = True
         thread.start()
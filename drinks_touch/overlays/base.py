@@ -1,3 +1,4 @@
+from pygame import Rect
 from pygame.event import EventType
 
 from screen import get_screen_surface
@@ -13,10 +14,26 @@ class BaseOverlay:
         self.screen = get_screen_surface()
         self.screen_manager = screen_manager
         self.t = 0.0
+        # Regions of the screen that were drawn to in the current frame
+        self.drawn_rects: list[Rect] = []
+
+    @property
+    def animating(self) -> bool:
+        return False
 
     def tick(self, dt: float):
         self.t += dt
 
+    def damaged_rects(self) -> list[Rect]:
+        """
+        Regions that have to be repainted before this overlay is rendered.
+        By default, everything drawn in the last frame is erased.
+        Called once per frame, before `render()`.
+        """
+        rects = self.drawn_rects
+        self.drawn_rects = []
+        return rects
+
     def render(self):
         pass
 
@@ -10,6 +10,7 @@ from elements.hbox import HBox
 from elements.spacer import Spacer
 from elements.vbox import VBox
 from overlays import BaseOverlay
+from surface_pool import get_surface, release_surface
 
 from typing import TYPE_CHECKING
 
@@ -312,6 +313,10 @@ class KeyboardOverlay(BaseOverlay):
         }
         self.layout = self.layouts[KeyboardLayout.DEFAULT]
         self._settings_for_object = None
+        self._layers: tuple = ()
+        self._drawn_opaque = False
+        # Where the keyboard was drawn last, erased when it's hidden
+        self._last_rect: pygame.Rect | None = None
 
     def set_keys_disabled(self, disabled_characters: str):
         chars = disabled_characters.lower()
@@ -330,21 +335,51 @@ class KeyboardOverlay(BaseOverlay):
         for obj in self.layout:
             obj.tick(dt)
 
+    @property
+    def animating(self) -> bool:
+        return bool(self.visible) and self.t < self.ANIMATION_DURATION
+
+    def damaged_rects(self) -> list[pygame.Rect]:
+        rects = super().damaged_rects()
+        if not self.visible and self._last_rect is not None:
+            # Not redrawn while it was shown completely, so drawn_rects is
+            # empty, but it's still on the screen
+            if self._last_rect not in rects:
+                rects.append(self._last_rect)
+            self._last_rect = None
+            return rects
+        if self.visible and self.t >= self.ANIMATION_DURATION:
+            # Once the animation finished, the keyboard is opaque and will be
+            # drawn over anything that changed below it. No need to erase it.
+            return []
+        return rects
+
     def render(self):
         if not self.visible:
+            self._drawn_opaque = False
             return
-        surface = pygame.Surface(
-            (self.screen.get_width(), self.height), pygame.SRCALPHA
+        animating = self.t < self.ANIMATION_DURATION
+        layers = tuple(
+            (obj.render(), obj.screen_pos) for obj in self.layout if obj.visible
         )
+        rect = pygame.Rect(self.pos, (self.screen.get_width(), self.height))
+        if (
+            self._drawn_opaque
+            and not animating
+            and layers == self._layers
+            and not self.screen_manager.compositor.collides(rect)
+        ):
+            # Nothing changed, the keyboard is still on the screen
+            return
+
+        surface = get_surface((self.screen.get_width(), self.height))
         surface.fill((0, 0, 0, 255))
 
-        for obj in self.layout:
-            if not obj.visible:
-                continue
-            if obj_surface := obj.render():
-                surface.blit(obj_surface, obj.screen_pos)
+        for obj_surface, obj_pos in layers:
+            if obj_surface:
+                surface.blit(obj_surface, obj_pos)
 
-        if self.t < self.ANIMATION_DURATION:
+        if animating:
             alpha = int((self.t / self.ANIMATION_DURATION) * 255)
             surface.set_alpha(alpha)
 
@@ -352,7 +387,11 @@ class KeyboardOverlay(BaseOverlay):
         else:
             pos = self.pos
 
-        self.screen.blit(surface, pos)
+        self._last_rect = self.screen.blit(surface, pos)
+        self.drawn_rects.append(self._last_rect)
+        release_surface(surface)
+        self._layers = layers
+        self._drawn_opaque = not animating
 
     def events(self, events: list[EventType]):
         if not self.visible:
@@ -5,6 +5,7 @@ import config
 import math
 
 from screens.screen_manager import ScreenManager
+from surface_pool import get_surface, release_surface
 from .base import BaseOverlay
 
 
@@ -17,6 +18,11 @@ class MouseOverlay(BaseOverlay):
         self.color = config.Color.PRIMARY
         self.mouse_pressed = False
 
+    @property
+    def animating(self) -> bool:
+        # The click animation stops after 2 seconds, see below
+        return self.t <= 2 or self.mouse_pressed or bool(self.mouse_path)
+
     def render(self):
         self._render_click_animation()
         self._render_mouse_path()
@@ -39,35 +45,49 @@ class MouseOverlay(BaseOverlay):
                 self.click_pos[0] + radius_outer * math.cos(math.radians(angel)),
                 self.click_pos[1] + radius_outer * math.sin(math.radians(angel)),
             )
-            pygame.draw.line(
+            rect = pygame.draw.line(
                 self.screen,
                 self.color.value,
                 start_pos,
                 end_pos,
                 width=3,
             )
+            self.drawn_rects.append(rect)
             if ScreenManager.instance.DEBUG_LEVEL >= 2:
-                pygame.draw.circle(self.screen, (255, 0, 255), start_pos, 3)
-                pygame.draw.circle(self.screen, (0, 255, 255), end_pos, 3)
+                self.drawn_rects.append(
+                    pygame.draw.circle(self.screen, (255, 0, 255), start_pos, 3)
+                )
+                self.drawn_rects.append(
+                    pygame.draw.circle(self.screen, (0, 255, 255), end_pos, 3)
+                )
 
     def _render_mouse_pos(self):
         if not self.mouse_pressed:
             return
-        pygame.draw.circle(self.screen, self.color.value, self.mouse_pos, 5)
+        self.drawn_rects.append(
+            pygame.draw.circle(self.screen, self.color.value, self.mouse_pos, 5)
+        )
 
     def _render_mouse_path(self):
         if len(self.mouse_path) > 2:
+            # Only draw the area covered by the path, not the whole screen
+            area = pygame.Rect(self.mouse_path[0][1], (1, 1)).unionall(
+                [pygame.Rect(pos, (1, 1)) for _, pos in self.mouse_path]
+            )
+            area.inflate_ip(2, 2)
+            surface = get_surface(area.size)
+            offset = pygame.Vector2(area.topleft)
             last_pos = self.mouse_path[0][1]
             new_mouse_path = []
-            surface = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
             for i, (color, pos) in enumerate(self.mouse_path):
-                pygame.draw.line(surface, color, last_pos, pos, 1)
+                pygame.draw.line(surface, color, last_pos - offset, pos - offset, 1)
                 color = (color[0], color[1], color[2], max(0, color[3] - 30))
                 if color[3] > 0:
                     new_mouse_path.append((color, pos))
                 last_pos = pos
             self.mouse_path = new_mouse_path
-            self.screen.blit(surface, (0, 0))
+            self.drawn_rects.append(self.screen.blit(surface, area))
+            release_surface(surface)
 
     def events(self, events: list[EventType]):
         self.mouse_pressed = pygame.mouse.get_pressed()[0]
@@ -0,0 +1,59 @@
+from pygame import Rect
+
+import config
+from fonts import get_font, render_text
+from purchase_journal import purchase_journal
+from screens.screen_manager import ScreenManager
+from surface_pool import get_surface, release_surface
+from .base import BaseOverlay
+
+
+class PendingPurchasesOverlay(BaseOverlay):
+    """
+    Shows how many purchases weren't written to the database yet
+    """
+
+    def __init__(self, screen_manager: ScreenManager):
+        super().__init__(screen_manager)
+        self.count = 0
+        self.changed = False
+        self.rect: Rect | None = None
+
+    def tick(self, dt: float):
+        super().tick(dt)
+        count = purchase_journal.pending_count
+        if count != self.count:
+            self.count = count
+            self.changed = True
+
+    def damaged_rects(self) -> list[Rect]:
+        # Unlike other overlays, the label stays on the screen until it changes
+        self.drawn_rects = []
+        if self.changed and self.rect is not None:
+            rect, self.rect = self.rect, None
+            return [rect]
+        return []
+
+    def render(self):
+        if not self.count:
+            self.changed = False
+            return
+        compositor = self.screen_manager.compositor
+        if not self.changed and self.rect and not compositor.collides(self.rect):
+            return
+        self.changed = False
+
+        font = get_font(config.Font.SANS_SERIF, 14)
+        text = f"{self.count} Käufe nicht gespeichert"
+        if self.count == 1:
+            text = "1 Kauf nicht gespeichert"
+        text_surface = render_text(font, text, config.Color.PRIMARY.value)
+        self.rect = text_surface.get_rect()
+        self.rect.bottomleft = (0, config.SCREEN_HEIGHT)
+
+        surface = get_surface(self.rect.size)
+        # Opaque, because it's drawn again on top of itself
+        surface.fill((0, 0, 0, 255))
+        surface.blit(text_surface, (0, 0))
+        self.drawn_rects.append(self.screen.blit(surface, self.rect))
+        release_surface(surface)
@@ -0,0 +1,161 @@
+"""
+Runs the tasks that have an INTERVAL in the background.
+
+The tasks used to run only when the kiosk started, so deposits, users and the
+calendar could be days old. Now a background thread checks every minute which
+tasks are due and runs them in a TaskScheduler while the kiosk stays usable.
+New runs only start while the home screen is shown, not while someone buys
+a drink.
+
+When a task last ran is stored in AppSettings, so a restart doesn't run every
+task again. Runs from the TasksScreen count as well. The next run is
+delayed by a random part of the interval, so that not all kiosks and tasks
+hit the servers at the same time.
+"""
+
+import logging
+import random
+import threading
+from datetime import datetime, timezone
+from inspect import getmembers, isclass
+
+from sqlalchemy import select
+
+import tasks as tasks_module
+from database.models import AppSettings
+from database.storage import Session, with_db
+from tasks.base import BaseTask, TaskScheduler
+
+logger = logging.getLogger(__name__)
+
+
+def discover_periodic_tasks() -> list[type[BaseTask]]:
+    return [
+        Task
+        for _, Task in getmembers(tasks_module, isclass)
+        if issubclass(Task, BaseTask) and Task.INTERVAL is not None
+    ]
+
+
+def _kiosk_idle() -> bool:
+    from screens.screen_manager import ScreenManager
+    from screens.wait_scan import WaitScanScreen
+
+    if ScreenManager.instance is None:
+        return False
+    return isinstance(ScreenManager.instance.get_active(), WaitScanScreen)
+
+
+class PeriodicTasks:
+    CHECK_INTERVAL = 60
+    # Part of the interval by which a run is delayed at most
+    JITTER = 0.1
+    SETTINGS_PREFIX = "last_run."
+
+    def __init__(self):
+        self.task_classes = discover_periodic_tasks()
+        # Reused, every instance adds a log handler
+        self.tasks: dict[type[BaseTask], BaseTask] = {}
+        self.next_runs: dict[type[BaseTask], datetime] | None = None
+        self.scheduler: TaskScheduler | None = None
+        self.event = threading.Event()
+        self.thread: threading.Thread | None = None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._run, name="PeriodicTasks")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            self.event.wait(self.CHECK_INTERVAL)
+            self.event.clear()
+            try:
+                self.check()
+            except Exception:
+                logger.warning("Couldn't run periodic tasks", exc_info=True)
+                Session.remove()
+
+    def check(self):
+        if self.scheduler is not None and not self.scheduler.finished:
+            return
+        if not _kiosk_idle():
+            return
+        if self.next_runs is None:
+            self.next_runs = self._load_next_runs()
+        now = datetime.now(timezone.utc)
+        due = [
+            Task
+            for Task in self.task_classes
+            if Task not in self.next_runs or self.next_runs[Task] <= now
+        ]
+        if not due:
+            return
+        due = self._with_dependencies(due)
+        logger.info("Running %s", ", ".join(Task.__name__ for Task in due))
+        for Task in due:
+            if Task not in self.tasks:
+                self.tasks[Task] = Task()
+        tasks = [self.tasks[Task] for Task in due]
+        self.scheduler = TaskScheduler(tasks, on_done=self.record_run)
+        self.scheduler.start()
+
+    def _with_dependencies(self, due: list[type[BaseTask]]) -> list[type[BaseTask]]:
+        """
+        DEPENDS_ON only orders tasks within one TaskScheduler, so the
+        dependencies of a due task run with it, even if they aren't due yet.
+        Otherwise e.g. the mails could be sent right before a SEPA sync.
+        """
+        due = list(due)
+        for Task in due:
+            for Dependency in self.task_classes:
+                if Dependency not in due and issubclass(Dependency, Task.DEPENDS_ON):
+                    due.append(Dependency)
+        return due
+
+    def _next_run(self, Task: type[BaseTask], last_run: datetime) -> datetime:
+        return last_run + Task.INTERVAL * (1 + self.JITTER * random.random())
+
+    @with_db
+    def _load_next_runs(self) -> dict[type[BaseTask], datetime]:
+        query = select(AppSettings).where(
+            AppSettings.key.startswith(self.SETTINGS_PREFIX)
+        )
+        last_runs = {
+            setting.key.removeprefix(self.SETTINGS_PREFIX): setting.value
+            for setting in Session().execute(query).scalars()
+        }
+        next_runs = {}
+        for Task in self.task_classes:
+            if (last_run := last_runs.get(Task.__name__)) is not None:
+                next_runs[Task] = self._next_run(Task, datetime.fromisoformat(last_run))
+        return next_runs
+
+    def record_run(self, task: BaseTask):
+        """
+        Passed as `on_done` to every scheduler that runs periodic tasks
+        """
+        Task = type(task)
+        if Task.INTERVAL is None:
+            return
+        now = datetime.now(timezone.utc)
+        if self.next_runs is not None:
+            self.next_runs[Task] = self._next_run(Task, now)
+        try:
+            self._save_last_run(Task, now)
+        except Exception:
+            logger.warning("Couldn't save last run of %s", Task.__name__, exc_info=True)
+            Session.remove()
+
+    @with_db
+    def _save_last_run(self, Task: type[BaseTask], last_run: datetime):
+        Session().merge(
+            AppSettings(
+                key=self.SETTINGS_PREFIX + Task.__name__, value=last_run.isoformat()
+            )
+        )
+
+
+periodic_tasks = PeriodicTasks()
@@ -0,0 +1,273 @@
+"""
+Local journal of purchases.
+
+A purchase is first written to a SQLite database on the local disk and the
+user can carry on right away. A background thread copies the purchases to
+Postgres as soon as it is reachable, so neither a slow nor an unreachable
+database blocks buying drinks.
+
+Every purchase gets the UUID of its transaction when it is written to the
+journal. The transaction is inserted with exactly this id and nothing happens
+if it exists already, so a purchase is never booked twice, even if the
+application stops between inserting it and marking it as drained.
+"""
+
+import logging
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import OperationalError
+
+import config
+from database.models import Tx
+from database.storage import Session, with_db
+from frame_scheduler import wake
+from local_replica import replica
+
+logger = logging.getLogger(__name__)
+
+
+class PurchaseJournal:
+    # Drained purchases are kept for a while to be able to look into problems
+    KEEP_DRAINED = timedelta(days=30)
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._pending_count: int | None = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            # Every commit is written to disk before it returns
+            connection.execute("PRAGMA synchronous = FULL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS purchase (
+                    id TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    account_id INTEGER NOT NULL,
+                    ean TEXT NOT NULL,
+                    amount TEXT NOT NULL,
+                    payment_reference TEXT NOT NULL,
+                    drained_at TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS purchase_pending "
+                "ON purchase (account_id) WHERE drained_at IS NULL"
+            )
+            self._connection = connection
+        return self._connection
+
+    def append(
+        self, account_id: int, ean: str, amount: Decimal, payment_reference: str
+    ) -> str:
+        """
+        Writes a purchase to the disk and returns the id of its transaction
+        """
+        tx_id = str(uuid.uuid4())
+        created_at = datetime.now(timezone.utc).isoformat()
+        with self.lock:
+            self.connection.execute(
+                "INSERT INTO purchase "
+                "(id, created_at, account_id, ean, amount, payment_reference) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (tx_id, created_at, account_id, ean, str(amount), payment_reference),
+            )
+            self._pending_count = None
+        logger.info("Purchase %s of account %d journaled", tx_id, account_id)
+        drainer.notify()
+        return tx_id
+
+    def pending(self) -> list[dict]:
+        with self.lock:
+            cursor = self.connection.execute(
+                "SELECT id, created_at, account_id, ean, amount, payment_reference "
+                "FROM purchase WHERE drained_at IS NULL ORDER BY created_at"
+            )
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    @property
+    def pending_count(self) -> int:
+        """
+        Cached, so that it can be read on every frame
+        """
+        if self._pending_count is None:
+            with self.lock:
+                (self._pending_count,) = self.connection.execute(
+                    "SELECT count(*) FROM purchase WHERE drained_at IS NULL"
+                ).fetchone()
+        return self._pending_count
+
+    def pending_amount(
+        self, account_id: int, drained_after: datetime | None = None
+    ) -> Decimal:
+        """
+        Sum of the purchases of the account that aren't in Postgres yet.
+        Purchases drained after `drained_after` are counted as well, for a
+        balance that was read at that time.
+        """
+        condition = "drained_at IS NULL"
+        params = [account_id]
+        if drained_after is not None:
+            condition = "(drained_at IS NULL OR drained_at > ?)"
+            params.append(drained_after.astimezone(timezone.utc).isoformat())
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT amount FROM purchase WHERE account_id = ? AND {condition}",
+                params,
+            ).fetchall()
+        return sum((Decimal(amount) for (amount,) in rows), Decimal(0))
+
+    def drained_account_ids(self, after: datetime, until: datetime) -> set[int]:
+        """
+        The accounts with purchases that were drained in this period
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT DISTINCT account_id FROM purchase "
+                "WHERE drained_at > ? AND drained_at <= ?",
+                (
+                    after.astimezone(timezone.utc).isoformat(),
+                    until.astimezone(timezone.utc).isoformat(),
+                ),
+            ).fetchall()
+        return {account_id for (account_id,) in rows}
+
+    def mark_drained(self, tx_id: str):
+        with self.lock:
+            self.connection.execute(
+                "UPDATE purchase SET drained_at = ? WHERE id = ?",
+                (datetime.now(timezone.utc).isoformat(), tx_id),
+            )
+            self._pending_count = None
+
+    def mark_failed(self, tx_id: str, error: str):
+        with self.lock:
+            self.connection.execute(
+                "UPDATE purchase SET attempts = attempts + 1, last_error = ? "
+                "WHERE id = ?",
+                (error, tx_id),
+            )
+
+    def prune(self):
+        """
+        Deletes purchases that were drained a while ago
+        """
+        before = datetime.now(timezone.utc) - self.KEEP_DRAINED
+        with self.lock:
+            self.connection.execute(
+                "DELETE FROM purchase WHERE drained_at < ?", (before.isoformat(),)
+            )
+
+
+class JournalDrainer:
+    """
+    Copies the purchases of the journal to Postgres in a background thread.
+    Failed attempts are retried with an increasing delay.
+    """
+
+    MIN_RETRY_DELAY = 1
+    MAX_RETRY_DELAY = 60
+
+    def __init__(self, journal: PurchaseJournal):
+        self.journal = journal
+        self.event = threading.Event()
+        self.thread: threading.Thread | None = None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._run, name="JournalDrainer")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def notify(self):
+        """
+        Drains the journal now instead of waiting for the next retry
+        """
+        self.event.set()
+
+    def _run(self):
+        self.journal.prune()
+        delay = self.MIN_RETRY_DELAY
+        while True:
+            self.event.clear()
+            if self.drain():
+                delay = self.MIN_RETRY_DELAY
+                self.event.wait()
+            else:
+                self.event.wait(delay)
+                delay = min(delay * 2, self.MAX_RETRY_DELAY)
+
+    def drain(self) -> bool:
+        """
+        Returns False if a purchase couldn't be copied
+        """
+        success = True
+        drained = False
+        for purchase in self.journal.pending():
+            try:
+                self._insert(purchase)
+            except OperationalError as e:
+                # Database unreachable, the other purchases would fail as well
+                logger.warning("Couldn't drain purchase %s: %s", purchase["id"], e)
+                self.journal.mark_failed(purchase["id"], repr(e))
+                Session.remove()
+                return False
+            except Exception as e:
+                # Probably a bug, the next purchases might work
+                logger.exception("Couldn't drain purchase %s", purchase["id"])
+                self.journal.mark_failed(purchase["id"], repr(e))
+                Session.remove()
+                success = False
+                continue
+            self.journal.mark_drained(purchase["id"])
+            drained = True
+            wake()
+        if drained:
+            # Drained purchases count as pending until the replica read the
+            # balances again, see Account.known_balance. Otherwise, that could
+            # take minutes if the change feed is down.
+            replica.notify()
+        return success
+
+    @staticmethod
+    @with_db
+    def _insert(purchase: dict):
+        created_at = datetime.fromisoformat(purchase["created_at"])
+        query = (
+            insert(Tx)
+            .values(
+                id=uuid.UUID(purchase["id"]),
+                created_at=created_at,
+                payment_reference=purchase["payment_reference"],
+                ean=purchase["ean"],
+                account_id=purchase["account_id"],
+                amount=Decimal(purchase["amount"]),
+            )
+            .on_conflict_do_nothing(index_elements=[Tx.id])
+        )
+        # The sale is counted by a trigger, see SalesDay
+        if not Session().execute(query).rowcount:
+            logger.warning("Purchase %s was drained before", purchase["id"])
+
+
+purchase_journal = PurchaseJournal(config.PURCHASE_JOURNAL_PATH)
+drainer = JournalDrainer(purchase_journal)
@@ -75,6 +75,10 @@ def __get_screen_framebuffer() -> Surface:
         raise NoVideoDriverException("No suitable video driver found!")
     logger.info("Using SDL_VIDEODRIVER %s", os.environ["SDL_VIDEODRIVER"])
 
+    if os.environ["SDL_VIDEODRIVER"] == "dummy":
+        # Headless, e.g. benchmark.py. Render at the size of the kiosk's screen.
+        return pygame.display.set_mode((config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+
     size = (pygame.display.Info().current_w, pygame.display.Info().current_h)
     logger.info("Framebuffer size: %d x %d" % (size[0], size[1]))
     flags = pygame.SCALED | pygame.FULLSCREEN | pygame.NOFRAME
@@ -1,11 +1,13 @@
 import config
-from database.models import Tx, Sale, Account, Drink
-from database.storage import Session, with_db
+from change_feed import Change
+from database.models import Account, Drink
 from elements import Label, Button
 from elements.hbox import HBox
 from elements.spacer import Spacer
 from elements.vbox import VBox
 from notifications.notification import send_drink
+from local_replica import replica
+from purchase_journal import purchase_journal
 from screens.screen import Screen
 from screens.success import SuccessScreen
 
@@ -17,8 +19,9 @@ class ConfirmPaymentScreen(Screen):
         self.account = account
         self.drink = drink
 
-    @with_db
     def on_start(self):
+        # Not `balance`, a slow database mustn't keep anyone from buying
+        balance = self.account.known_balance
 
         if not self.drink.price:
             if config.DEFAULT_DRINK_PRICE:
@@ -27,6 +30,14 @@ class ConfirmPaymentScreen(Screen):
                 raise NotImplementedError(
                     "Display that a price has yet to be determined"
                 )
+        # Read now, so that saving the purchase doesn't need the database
+        self.purchase = {
+            "account_id": self.account.id,
+            "ean": self.drink.ean,
+            "amount": -1 * self.drink.price,
+            "payment_reference": f'Kauf "{self.drink.name}"',
+        }
+        self.drink_name = self.drink.name
 
         self.objects = [
             Label(
@@ -40,7 +51,7 @@ class ConfirmPaymentScreen(Screen):
                         size=20,
                     ),
                     Label(
-                        text=f"{self.account.balance} €",
+                        text="? €" if balance is None else f"{balance} €",
                         size=40,
                     ),
                 ],
@@ -86,6 +97,16 @@ class ConfirmPaymentScreen(Screen):
             ),
         ]
 
+    def on_db_change(self, change: Change):
+        # Don't book the drink with an outdated price. The replica notifies
+        # the screen again once it read the change.
+        if change.concerns_drink(self.purchase["ean"]):
+            if (drink := replica.drink_by_ean(self.purchase["ean"])) is not None:
+                self.drink = drink
+            self.on_start()
+        elif change.concerns_account(self.purchase["account_id"]):
+            self.on_start()
+
     def on_barcode(self, barcode: str):
         from screens.drink_scanned import DrinkScannedScreen
 
@@ -94,24 +115,15 @@ class ConfirmPaymentScreen(Screen):
             return
         self.goto(DrinkScannedScreen(barcode), replace=True)
 
-    @with_db
     def save_drink(self):
-        assert self.drink.price, "Price must be set before saving a drink"
-        transaction = Tx(
-            payment_reference=f'Kauf "{self.drink.name}"',
-            ean=self.drink.ean,
-            account_id=self.account.id,
-            amount=-1 * self.drink.price,
-        )
-        Session().add(transaction)
-        sale = Sale(ean=self.drink.ean)
-        Session().add(sale)
+        # Doesn't wait for the database, see purchase_journal.py
+        purchase_journal.append(**self.purchase)
 
         self.goto(
             SuccessScreen(
                 self.account,
-                f"getrunken: {self.drink.name}",
-                on_start_fn=lambda: send_drink(self.account, self.drink.name),
+                f"getrunken: {self.drink_name}",
+                on_start_fn=lambda: send_drink(self.account, self.drink_name),
                 offer_games=True,
             ),
             replace=True,
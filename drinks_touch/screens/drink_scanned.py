@@ -6,6 +6,7 @@ from sqlalchemy import select
 import config
 from database.models import Account, Drink
 from database.storage import with_db, Session
+from local_replica import replica
 from screens.add_new_drink import AddNewDrinkScreen
 from screens.confirm_payment_screen import ConfirmPaymentScreen
 from screens.edit_drink import EditDrinkScreen
@@ -29,14 +30,19 @@ class DrinkScannedScreen(Screen):
 
     @with_db
     def on_start(self, *args, **kwargs):
-        query = select(Account).where(Account.id_card == self.barcode)
-        account = Session().execute(query).scalar_one_or_none()
+        account = replica.account_by_id_card(self.barcode)
+        drink = None if account else replica.drink_by_ean(self.barcode)
+        if account is None and drink is None:
+            # Unknown to the replica, e.g. added in the last seconds
+            query = select(Account).where(Account.id_card == self.barcode)
+            account = Session().execute(query).scalar_one_or_none()
         if account:
             self.goto(ProfileScreen(account), replace=True)
             return
 
-        query = select(Drink).where(Drink.ean == self.barcode)
-        drink = Session().execute(query).scalar_one_or_none()
+        if drink is None:
+            query = select(Drink).where(Drink.ean == self.barcode)
+            drink = Session().execute(query).scalar_one_or_none()
         if drink is None:
             if not config.DEFAULT_DRINK_PRICE:
                 self.goto(AddNewDrinkScreen(self.barcode), replace=True)
@@ -48,6 +54,8 @@ class DrinkScannedScreen(Screen):
 
         if not drink.price:
             if config.DEFAULT_DRINK_PRICE:
+                # The drink might come from the local replica and be detached
+                drink = Session().get(Drink, drink.id)
                 drink.price = config.DEFAULT_DRINK_PRICE
             else:
                 self.goto(EditDrinkScreen(drink), replace=True)
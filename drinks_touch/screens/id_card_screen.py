@@ -79,6 +79,8 @@ class IDCardScreen(Screen):
     @with_db
     def set_id(self, ean):
         ean = ean.upper() if ean else ean
+        # The account might come from the local replica and be detached
+        Session().get(Account, self.account.id).id_card = ean
         self.id_label.text = self.account.id_card = ean
 
     def reset_id(self):
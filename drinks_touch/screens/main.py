@@ -9,6 +9,7 @@ from database.storage import Session, with_db
 from elements import SvgIcon
 from elements.button import Button
 from elements.label import Label
+from local_replica import replica
 from .names import NamesScreen
 from .screen import Screen
 
@@ -40,7 +41,10 @@ class MainScreen(Screen):
             .order_by("first_char")
         )
 
-        rows = Session().execute(query).all()
+        if replica.ready:
+            rows = replica.first_chars()
+        else:
+            rows = Session().execute(query).all()
 
         today = datetime.now().date()
         april_fools = today.month == 4 and today.day == 1
@@ -73,8 +77,10 @@ class MainScreen(Screen):
 
         if not barcode:
             return
-        query = select(Account).where(Account.id_card == barcode)
-        account = Session().execute(query).scalar_one_or_none()
+        account = replica.account_by_id_card(barcode)
+        if account is None:
+            query = select(Account).where(Account.id_card == barcode)
+            account = Session().execute(query).scalar_one_or_none()
         if account:
             ScreenManager.instance.set_active(ProfileScreen(account))
 
@@ -39,6 +39,7 @@ class MakeTransferScreen(Screen):
     }
 
     nav_bar_visible = False
+    animating = True
 
     def __init__(self, account: Account, to_account: Account, amount: Decimal):
         super().__init__()
@@ -7,6 +7,7 @@ from database.models import Account
 from database.storage import Session, with_db
 from elements.button import Button
 from elements.label import Label
+from local_replica import replica
 from screens.profile import ProfileScreen
 from .screen import Screen
 
@@ -28,13 +29,16 @@ class NamesScreen(Screen):
             )
         )
 
-        query = (
-            select(Account)
-            .filter(Account.name.ilike(self.char + "%"))
-            .filter(Account.enabled)
-            .order_by(Account.name)
-        )
-        accounts = Session().execute(query).scalars().all()
+        if replica.ready:
+            accounts = replica.enabled_accounts_starting_with(self.char)
+        else:
+            query = (
+                select(Account)
+                .filter(Account.name_starts_with(self.char))
+                .filter(Account.enabled)
+                .order_by(Account.name)
+            )
+            accounts = Session().execute(query).scalars().all()
 
         btns_y = 7
         num_cols = int(math.ceil(len(accounts) / float(btns_y)))
@@ -59,7 +63,9 @@ class NamesScreen(Screen):
     def on_barcode(self, barcode):
         if not barcode:
             return
-        query = select(Account).where(Account.id_card == barcode)
-        account = Session().execute(query).scalar_one_or_none()
+        account = replica.account_by_id_card(barcode)
+        if account is None:
+            query = select(Account).where(Account.id_card == barcode)
+            account = Session().execute(query).scalar_one_or_none()
         if account:
             self.goto(ProfileScreen(account))
@@ -10,11 +10,14 @@ from elements import SvgIcon, Label, Button
 from elements.hbox import HBox
 from screens.screen import Screen
 from screens.success import TetrisIcon
-from screens.tetris.screen import TetrisScreen
 
 
 class PartyScreen(Screen):
     idle_timeout = 60000
+    track_damage = False
+    animating = True
+    display_sleep = False
+    observed = Screen.observed | {"hexagon_rotation", "zoom"}
 
     @with_db
     def __init__(self, *args, **kwargs):
@@ -76,13 +79,19 @@ class PartyScreen(Screen):
                         ),
                     ]
                 ),
-                on_click=lambda: self.goto(TetrisScreen(self.account)),
+                on_click=self.play_tetris,
                 size=20,
                 pos=(40, config.SCREEN_HEIGHT - 200),
             ),
         ]
 
     def on_barcode(self, barcode):
+        self.play_tetris()
+
+    def play_tetris(self):
+        # Imported here, so that the Tetris game is only loaded when it's played
+        from screens.tetris.screen import TetrisScreen
+
         self.goto(TetrisScreen(self.account))
 
     def tick(self, dt: float):
@@ -1,4 +1,5 @@
 import config
+from change_feed import Change
 from config import Font
 from database.models import Account
 from database.storage import with_db
@@ -24,15 +25,18 @@ class ProfileScreen(Screen):
         super().__init__()
 
         self.account = account
+        self.account_id = None
         self.processing = None
         self.drink_info = None
         self.zuordnen = None
         self.btn_abbrechen = None
+        self.label_balance = None
         self.elements_aufladungen = []
         self.elements_drinks = []
 
     @with_db
     def on_start(self, *args, **kwargs):
+        self.account_id = self.account.id
         GlobalState.selected_account = self.account
         if GlobalState.selected_account and GlobalState.selected_drink:
             self.goto(
@@ -44,6 +48,10 @@ class ProfileScreen(Screen):
 
         button_width = config.SCREEN_WIDTH - 10
         icon_text_gap = 15
+        self.label_balance = Label(
+            text=self.balance_text(),
+            size=40,
+        )
         self.objects = [
             Label(
                 text=self.account.name,
@@ -55,10 +63,7 @@ class ProfileScreen(Screen):
                         text="Guthaben",
                         size=20,
                     ),
-                    Label(
-                        text=f"{self.account.balance} €",
-                        size=40,
-                    ),
+                    self.label_balance,
                 ],
                 pos=(config.SCREEN_WIDTH - 5, 5),
                 align_right=True,
@@ -155,6 +160,18 @@ class ProfileScreen(Screen):
         ]
         return
 
+    def on_db_change(self, change: Change):
+        # E.g. recharged in the web app
+        if change.concerns_account(self.account_id):
+            self.label_balance.text = self.balance_text()
+
+    def balance_text(self) -> str:
+        # Not `balance`, a slow database would freeze the screen
+        balance = self.account.known_balance
+        if balance is None:
+            return "? €"
+        return f"{balance} €"
+
     @with_db
     def goto_transaction_history(self):
         if self.account.tx_history_visible:
@@ -1,10 +1,19 @@
+import time
+
 import pygame
 
 import config
+from change_feed import Change
 from config import Color
-from elements.base_elm import BaseElm
+from elements.base_elm import BaseElm, ElementList
+from fonts import get_font, render_text
+from frame_stats import frame_stats
 from screen import get_screen_surface
 from screens.screen_manager import ScreenManager
+from surface_pool import get_surface, release_surface
+
+
+_MISSING = object()
 
 
 class Screen:
@@ -12,6 +21,17 @@ class Screen:
     idle_timeout = 10
     nav_bar_visible = True
     background_color = Color.BACKGROUND.value
+    # Screens that draw more than their objects in `_render` have to disable
+    # this, so that the whole screen is pushed to the display on a change.
+    track_damage = True
+    # Screens that are meant to be watched (e.g. during a party) disable this
+    display_sleep = True
+    # Assigning a different value to one of these attributes renders the screen
+    # again. Changes of the objects are propagated by the objects themselves.
+    observed = frozenset({"objects", "width", "height", "_alert"})
+    # Screens that change state in place (which can't be observed) compare
+    # `calculate_hash()` with the last frame instead.
+    poll_hash = False
 
     def __init__(self, width=None, height=None):
         if width is None or height is None:
@@ -28,6 +48,23 @@ class Screen:
         self.last_hash = 0
         self.surface: pygame.Surface | None = None
         self.debug_surface: pygame.Surface | None = None
+        # Surfaces blitted in the last `_render` call and where they were blitted to
+        self._layers: list[tuple[pygame.Surface, pygame.Rect]] = []
+        self.damaged_rects: list[pygame.Rect] = []
+
+    def __setattr__(self, name, value):
+        if name not in self.observed:
+            super().__setattr__(name, value)
+            return
+        old = self.__dict__.get(name, _MISSING)
+        if name == "objects":
+            value = ElementList.replace(self, old, value)
+        super().__setattr__(name, value)
+        if old != value:
+            self.invalidate()
+
+    def invalidate(self):
+        self.dirty = True
 
     def __repr__(self):
         return f"<{self.__class__.__name__}>"
@@ -42,50 +79,99 @@ class Screen:
             )
         )
 
+    @property
+    def animating(self) -> bool:
+        """
+        True if the screen changes without any user interaction.
+        Screens that animate in `tick` or `_render` may set this to True.
+        """
+        return any(o.animating for o in self.objects)
+
     def tick(self, dt: float):
         for o in self.objects:
             o.tick(dt)
 
     def _render(self) -> tuple[pygame.Surface, pygame.Surface | None]:
-        surface = pygame.Surface((self.width, self.height))
+        surface = get_surface((self.width, self.height), alpha=False)
         surface.fill(self.background_color)
         if ScreenManager.instance.DEBUG_LEVEL >= 3:
             debug_surface = pygame.Surface((self.width, self.height))
         else:
             debug_surface = None
+        layers = []
         for o in self.objects:
             if not o.visible:
                 continue
             if obj_surface := o.render():
-                surface.blit(obj_surface, o.screen_pos)
+                rect = surface.blit(obj_surface, o.screen_pos)
+                layers.append((obj_surface, rect))
                 if ScreenManager.instance.DEBUG_LEVEL >= 3:
                     if obj_debug_surface := o.render_debug():
                         debug_surface.blit(obj_debug_surface, o.screen_pos)
         for o in self.objects:
             if o.visible and (overlay_surface := o.render_overlay()):
-                surface.blit(overlay_surface, o.screen_pos)
+                rect = surface.blit(overlay_surface, o.screen_pos)
+                layers.append((overlay_surface, rect))
         if self._alert:
             alert = self.render_alert()
-            surface.blit(alert, (0, 0))
+            rect = surface.blit(alert, (0, 0))
+            layers.append((alert, rect))
+        self._layers = layers
 
         return surface, debug_surface
 
     def render(self) -> tuple[pygame.Surface, pygame.Surface | None]:
         """
-        Caches the result of the internal `_render` method
+        Caches the result of the internal `_render` method.
+        The regions that changed since the last call are stored in `damaged_rects`.
         """
-        if self.last_hash != (new_hash := self.calculate_hash()):
-            self.dirty = True
-            self.last_hash = new_hash
+        if self.poll_hash:
+            if self.last_hash != (new_hash := self.calculate_hash()):
+                self.dirty = True
+                self.last_hash = new_hash
+        elif config.VERIFY_INVALIDATION and not self.dirty:
+            assert (
+                self.last_hash == self.calculate_hash()
+            ), f"{self!r} changed without being invalidated"
         if self.dirty:
-            self.surface, self.debug_surface = self._render()
+            previous_layers = self._layers
+            previous_surface = self.surface
+            # Cleared before rendering, see BaseElm.render
             self.dirty = False
+            start = time.perf_counter()
+            self.surface, self.debug_surface = self._render()
+            frame_stats.add_screen(type(self).__name__, time.perf_counter() - start)
+            release_surface(previous_surface)
+            if config.VERIFY_INVALIDATION and not self.poll_hash:
+                self.last_hash = self.calculate_hash()
+            if self.track_damage:
+                self.damaged_rects = self._diff_layers(previous_layers, self._layers)
+            else:
+                self.damaged_rects = [pygame.Rect(0, 0, self.width, self.height)]
+        else:
+            self.damaged_rects = []
         return self.surface, self.debug_surface
 
+    @staticmethod
+    def _diff_layers(
+        old: list[tuple[pygame.Surface, pygame.Rect]],
+        new: list[tuple[pygame.Surface, pygame.Rect]],
+    ) -> list[pygame.Rect]:
+        """
+        Elements only return a new surface if they were re-rendered.
+        Therefore, every layer that isn't present in both lists marks a
+        changed region: either something was drawn there or removed from there.
+        """
+        old_keys = {(id(s), tuple(r)): r for s, r in old}
+        new_keys = {(id(s), tuple(r)): r for s, r in new}
+        return [
+            rect
+            for key, rect in (old_keys | new_keys).items()
+            if (key in old_keys) != (key in new_keys)
+        ]
+
     def render_alert(self) -> pygame.Surface:
-        alert_text_surface = pygame.font.Font(None, 30).render(
-            self._alert, True, (255, 0, 0)
-        )
+        alert_text_surface = render_text(get_font(None, 30), self._alert, (255, 0, 0))
         padding = 10
         alert_box = pygame.Surface(
             (
@@ -170,6 +256,14 @@ class Screen:
     # def on_pause(self):
     #     pass
 
+    def on_db_change(self, change: Change):
+        """
+        Called when an account, drink or transaction was changed, possibly by
+        another process, see change_feed.py. Screens that show such data
+        can update it.
+        """
+        pass
+
     def on_stop(self, *args, **kwargs):
         pass
 
@@ -1,7 +1,12 @@
+import queue
+import time
+
 import pygame
 from pygame.event import EventType
 
 import config
+from change_feed import Change
+from compositor import Compositor
 from config import Color, Font
 from database.storage import Session
 from state import GlobalState
@@ -9,6 +14,10 @@ from elements import Button, Progress, Label
 from elements.base_elm import BaseElm
 from overlays.keyboard import KeyboardOverlay
 from screen import get_screen_surface
+from fonts import get_font, get_sys_font, render_text, text_cache_stats
+from frame_scheduler import wake
+from frame_stats import frame_stats
+from surface_pool import get_surface, release_surface, surface_pool_stats
 
 from typing import TYPE_CHECKING
 
@@ -21,12 +30,22 @@ class ScreenManager:
     MENU_BAR_HEIGHT = 65
     DEBUG_LEVEL = int(config.DEBUG_LEVEL)
     MAX_DEBUG_LEVEL = 3
+    # Seconds between updates of the frame timings shown at debug level 2
+    HUD_UPDATE_INTERVAL = 0.5
 
     def __init__(self):
         assert ScreenManager.instance is None, "ScreenManager is a singleton"
         self.ts = 0
         self.current_screen = None
         self.surface = get_screen_surface()
+        self.compositor = Compositor(self.surface)
+        self._rendered_screen: "Screen | None" = None
+        self._menu_bar: pygame.Surface | None = None
+        self._menu_bar_layers: tuple = ()
+        self._header_drawn = False
+        self._hud: pygame.Surface | None = None
+        self._hud_ts = 0.0
+        self.blank = False
         self.screen_history: list[Screen] = []
         self.timeout_widget = Progress(
             pos=(config.SCREEN_WIDTH - 5, 10),
@@ -55,6 +74,8 @@ class ScreenManager:
             self.timeout_widget,
         ]
         self.active_object = None
+        # Changes of the database, passed to the active screen on the next tick
+        self.changes: queue.SimpleQueue[Change] = queue.SimpleQueue()
         ScreenManager.instance = self
 
     @property
@@ -134,8 +155,17 @@ class ScreenManager:
             return False
         return self.get_active().nav_bar_visible
 
+    def on_change(self, change: Change):
+        """
+        Subscribed to the change feed, called from its thread
+        """
+        self.changes.put(change)
+        wake()
+
     def tick(self, dt: float):
         self.ts += dt
+        while not self.changes.empty():
+            self.get_active().on_db_change(self.changes.get())
         if self.active_object:
             self.active_object.ts_active += dt
         obj_list = (
@@ -148,60 +178,189 @@ class ScreenManager:
                 obj.tick(dt)
         self.get_active().tick(dt)
 
-    def render(self, fps):
-        self.surface.fill(Color.BACKGROUND.value)
-        current_screen = self.get_active()
-        surface, debug_surface = current_screen.render()
-        if surface is not None:
-            self.surface.blit(surface, (0, 0))
-        if debug_surface is not None:
-            self.surface.blit(debug_surface, (0, 0), special_flags=pygame.BLEND_ADD)
-
+    @property
+    def animating(self) -> bool:
         if self.nav_bar_visible:
-            menu_bar = pygame.Surface((self.surface.get_width(), self.MENU_BAR_HEIGHT))
-            menu_bar.fill(Color.NAVBAR_BACKGROUND.value)
-            # draw top border
-            pygame.draw.line(
-                menu_bar, Color.PRIMARY.value, (0, 0), (menu_bar.get_width(), 0)
-            )
             obj_list = (
                 self.active_keyboard_objects
                 if self.keyboard_visible
                 else self.default_objects
             )
-            for obj in obj_list:
-                if not obj.visible:
-                    continue
-                menu_bar.blit(obj.render(), obj.screen_pos)
-            # back_surface = pygame.Surface((100, 50))
-            # back_surface.fill((255, 0, 255))
-            # back_surface.blit(
-            #     pygame.font.Font(None, 30).render("Back", True, (0, 0, 0)), (10, 10)
-            # )
-            self.surface.blit(
-                menu_bar, (0, self.surface.get_height() - menu_bar.get_height())
-            )
+            if any(obj.animating for obj in obj_list):
+                return True
+        return self.get_active().animating
+
+    @property
+    def display_sleep(self) -> bool:
+        return self.get_active().display_sleep
+
+    @property
+    def menu_bar_rect(self) -> pygame.Rect:
+        return pygame.Rect(
+            0,
+            self.surface.get_height() - self.MENU_BAR_HEIGHT,
+            self.surface.get_width(),
+            self.MENU_BAR_HEIGHT,
+        )
+
+    @property
+    def header_rect(self) -> pygame.Rect:
+        """
+        Area of the debug info and the "open transaction" banner
+        """
+        return pygame.Rect(0, 0, self.surface.get_width(), 60)
 
+    def _render_menu_bar(self) -> pygame.Surface | None:
+        """
+        Returns the cached menu bar. It is only re-rendered if one of its
+        objects returned a new surface.
+        """
+        if not self.nav_bar_visible:
+            if self._menu_bar is not None:
+                self.compositor.damage(self.menu_bar_rect)
+                release_surface(self._menu_bar)
+                self._menu_bar = None
+                self._menu_bar_layers = ()
+            return None
+        obj_list = (
+            self.active_keyboard_objects
+            if self.keyboard_visible
+            else self.default_objects
+        )
+        layers = tuple(
+            (obj.render(), obj.screen_pos) for obj in obj_list if obj.visible
+        )
+        if self._menu_bar is not None and layers == self._menu_bar_layers:
+            return self._menu_bar
+
+        menu_bar = get_surface(
+            (self.surface.get_width(), self.MENU_BAR_HEIGHT), alpha=False
+        )
+        menu_bar.fill(Color.NAVBAR_BACKGROUND.value)
+        # draw top border
+        pygame.draw.line(
+            menu_bar, Color.PRIMARY.value, (0, 0), (menu_bar.get_width(), 0)
+        )
+        for obj_surface, pos in layers:
+            menu_bar.blit(obj_surface, pos)
+        release_surface(self._menu_bar)
+        self._menu_bar = menu_bar
+        self._menu_bar_layers = layers
+        self.compositor.damage(self.menu_bar_rect)
+        return menu_bar
+
+    def _render_hud(self) -> pygame.Surface | None:
+        """
+        Returns the frame timings, which are re-rendered twice per second.
+        """
+        if self.DEBUG_LEVEL < 2:
+            if self._hud is not None:
+                self.compositor.damage(
+                    self._hud.get_rect(topleft=self.header_rect.bottomleft)
+                )
+                release_surface(self._hud)
+                self._hud = None
+            return None
+        now = time.monotonic()
+        if self._hud is None or now - self._hud_ts > self.HUD_UPDATE_INTERVAL:
+            font = get_sys_font("monospace", 14)
+            line_height = font.get_linesize()
+            lines = frame_stats.summary(top=5)
+            hud = get_surface((self.surface.get_width(), len(lines) * line_height + 10))
+            hud.fill((0, 0, 0, 180))
+            for i, line in enumerate(lines):
+                text = font.render(line, True, (255, 255, 255))
+                hud.blit(text, (5, 5 + i * line_height))
+            release_surface(self._hud)
+            self._hud = hud
+            self._hud_ts = now
+        # Whatever is below might have changed as well
+        self.compositor.damage(self._hud.get_rect(topleft=self.header_rect.bottomleft))
+        return self._hud
+
+    def render_blank(self):
+        """
+        Turns the display black, e.g. while the display sleeps.
+        The next call to `render()` repaints everything.
+        """
+        if self.blank:
+            return
+        self.surface.fill(Color.BLACK.value)
+        self.compositor.damage_all()
+        self._rendered_screen = None
+        release_surface(self._menu_bar)
+        self._menu_bar = None
+        release_surface(self._hud)
+        self._hud = None
+        self.blank = True
+
+    def render(self, fps):
+        self.blank = False
+        compositor = self.compositor
+        current_screen = self.get_active()
+        frame_stats.screen = type(current_screen).__name__
+        surface, debug_surface = current_screen.render()
+        if current_screen is not self._rendered_screen:
+            self._rendered_screen = current_screen
+            compositor.damage_all()
+        else:
+            compositor.damage(*current_screen.damaged_rects)
+        if debug_surface is not None:
+            compositor.damage_all()
+
+        menu_bar = self._render_menu_bar()
+
+        header = []
         if self.DEBUG_LEVEL >= 1:
             info = pygame.display.Info()
-            font = pygame.font.Font(None, 30)
-            resolution_text = font.render(
-                f"{info.current_w}x{info.current_h}", True, (255, 255, 255)
+            font = get_font(None, 30)
+            resolution_text = render_text(
+                font, f"{info.current_w}x{info.current_h}", (255, 255, 255)
             )
+            # Changes every frame, no need to cache it
             fps_text = font.render(f"FPS: {fps:.2f}", True, (255, 255, 255))
-            self.surface.blit(resolution_text, (10, 10))
-            self.surface.blit(
-                fps_text, (self.surface.get_width() - fps_text.get_width() - 10, 10)
+            header.append((resolution_text, (10, 10)))
+            header.append(
+                (fps_text, (self.surface.get_width() - fps_text.get_width() - 10, 10))
+            )
+        if self.DEBUG_LEVEL >= 2:
+            text_stats = text_cache_stats()
+            surface_stats = surface_pool_stats()
+            stats_text = get_font(None, 20).render(
+                f"Text cache {text_stats['hits']} hits / {text_stats['misses']} misses, "
+                f"surfaces {surface_stats['hits']} reused / "
+                f"{surface_stats['allocations']} allocated",
+                True,
+                (255, 255, 255),
             )
+            header.append((stats_text, (10, 35)))
         if Session().in_transaction():
-            font = pygame.font.Font(None, 37)
-            transaction_text = font.render(
+            transaction_text = render_text(
+                get_font(None, 37),
                 "Open transaction! Data isn't saved yet!",
-                True,
                 (255, 255, 255),
-                (255, 0, 0),
+                background=(255, 0, 0),
             )
-            self.surface.blit(transaction_text, (0, 0))
+            header.append((transaction_text, (0, 0)))
+        if header or self._header_drawn:
+            compositor.damage(self.header_rect)
+        self._header_drawn = bool(header)
+        hud = self._render_hud()
+
+        for clip in compositor.clip_rects:
+            self.surface.set_clip(clip)
+            self.surface.fill(Color.BACKGROUND.value)
+            if surface is not None:
+                self.surface.blit(surface, (0, 0))
+            if debug_surface is not None:
+                self.surface.blit(debug_surface, (0, 0), special_flags=pygame.BLEND_ADD)
+            if menu_bar is not None:
+                self.surface.blit(menu_bar, self.menu_bar_rect)
+            for text_surface, pos in header:
+                self.surface.blit(text_surface, pos)
+            if hud is not None:
+                self.surface.blit(hud, self.header_rect.bottomleft)
+        self.surface.set_clip(None)
 
     def events(self, events: list[EventType]):
         screen = self.get_active()
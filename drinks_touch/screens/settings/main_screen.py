@@ -4,7 +4,7 @@ from pygame.mixer import Sound
 from sqlalchemy import func
 
 import config
-from database.models import Tx
+from database.models import Account
 from database.storage import with_db, Session
 from elements import Button, SvgIcon, Label
 from elements.hbox import HBox
@@ -30,7 +30,9 @@ class SettingsMainScreen(Screen):
         self.sound = Sound("drinks_touch/resources/sounds/smb_pipe.wav")
 
         icon_text_gap = 15
-        total_balance = Session().query(func.sum(Tx.amount)).scalar() or Decimal(0)
+        total_balance = Session().query(
+            func.sum(Account.stored_balance)
+        ).scalar() or Decimal(0)
         total_balance_fmt = "{:.02f}€".format(total_balance)
 
         button_width = config.SCREEN_WIDTH - 10
@@ -1,3 +1,4 @@
+from decimal import Decimal
 from typing import Callable
 
 import pygame
@@ -14,12 +15,15 @@ from elements.label import Label
 from elements.vbox import VBox
 from .screen import Screen
 from .tetris.constants import SPRITE_RESOLUTION
-from .tetris.screen import TetrisScreen, Shape, BlockType
 
 
 class TetrisIcon(BaseElm):
+    observed = BaseElm.observed | {"scale", "shape"}
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # Imported here, so that the Tetris game is only loaded when it's offered
+        from .tetris.screen import Shape, BlockType
 
         self.scale = 1.5
         self.shape = Shape(BlockType.T)
@@ -62,6 +66,8 @@ class SuccessScreen(Screen):
 
     @with_db
     def on_start(self, *args, **kwargs):
+        # Not `balance`, a slow database would freeze the screen
+        balance = self.account.known_balance
 
         self.objects = [
             Label(
@@ -75,7 +81,7 @@ class SuccessScreen(Screen):
                         size=20,
                     ),
                     Label(
-                        text=f"{self.account.balance} €",
+                        text="? €" if balance is None else f"{balance} €",
                         size=40,
                     ),
                 ],
@@ -112,14 +118,14 @@ class SuccessScreen(Screen):
                                 ),
                             ]
                         ),
-                        on_click=lambda: self.goto(TetrisScreen(self.account)),
+                        on_click=self.play_tetris,
                         size=20,
                         pos=(40, config.SCREEN_HEIGHT - 300),
                     ),
                 ]
             )
 
-        self.play_sound()
+        self.play_sound(balance)
 
         if self.on_start_fn:
             self.on_start_fn()
@@ -127,15 +133,20 @@ class SuccessScreen(Screen):
     def event(self, event) -> BaseElm | None:
         if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
             if self.offer_games:
-                self.goto(TetrisScreen(self.account))
+                self.play_tetris()
             else:
                 self.home()
         else:
             return super().event(event)
 
-    def play_sound(self):
-        balance = self.account.balance
-        if balance >= 0:
+    def play_tetris(self):
+        from .tetris.screen import TetrisScreen
+
+        self.goto(TetrisScreen(self.account))
+
+    @staticmethod
+    def play_sound(balance: Decimal | None):
+        if balance is None or balance >= 0:
             filename = "smb_coin.wav"
         elif balance <= -30:
             filename = "rottenwarnanlage.mp3"
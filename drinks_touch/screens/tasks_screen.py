@@ -1,8 +1,9 @@
 from elements import Label
 from inspect import getmembers, isclass
 import tasks as tasks_module
+from periodic_tasks import periodic_tasks
 from elements.vbox import VBox
-from tasks.base import BaseTask
+from tasks.base import BaseTask, TaskScheduler
 from .screen import Screen
 from .screen_manager import ScreenManager
 
@@ -26,6 +27,7 @@ class TasksScreen(Screen):
             self.tasks = tasks
         else:
             self.tasks = [Task() for Task in discover_tasks()]
+        self.scheduler = TaskScheduler(self.tasks, on_done=periodic_tasks.record_run)
 
         if box_height is None:
             if len(self.tasks) == 1:
@@ -50,12 +52,10 @@ class TasksScreen(Screen):
             VBox(progress_bars, gap=10, pos=(5, 80)),
         ]
 
-        for task in self.tasks:
-            task.start()
+        self.scheduler.start()
 
     def on_stop(self, *args, **kwargs):
-        for task in self.tasks:
-            task.kill()
+        self.scheduler.kill()
 
     def tick(self, dt: float):
         super().tick(dt)
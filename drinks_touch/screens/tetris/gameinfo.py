@@ -4,6 +4,7 @@ import pygame
 from pygame import Vector2
 
 from config import Color, Font, SCREEN_WIDTH
+from fonts import get_font
 from screens.tetris.constants import BOARD_WIDTH, SPRITE_RESOLUTION, SCALE, BOARD_HEIGHT
 from screens.tetris.scoreboard import Scoreboard
 from screens.tetris.shape import Shape
@@ -110,7 +111,7 @@ class GameInfo:
             border_radius=10,
         )
 
-        title_font = pygame.font.Font(Font.MONOSPACE.value, 20)
+        title_font = get_font(Font.MONOSPACE, 20)
         title_surface = title_font.render("RESERVE", 1, Color.BLACK.value)
         surface.blit(title_surface, (5, 10))
 
@@ -134,7 +135,7 @@ class GameInfo:
             ),
         )
 
-        text_font = pygame.font.Font(Font.MONOSPACE.value, 16)
+        text_font = get_font(Font.MONOSPACE, 16)
         if not self.screen.reserve_block_used:
             text_surface = text_font.render("Tauschen", 1, Color.BLACK.value)
             surface.blit(text_surface, (45, 125))
@@ -151,7 +152,7 @@ class GameInfo:
             border_radius=10,
         )
 
-        font = pygame.font.Font(Font.MONOSPACE.value, 20)
+        font = get_font(Font.MONOSPACE, 20)
         title_level_surface = font.render("LEVEL", 1, Color.BLACK.value)
         title_lines_surface = font.render("LINES", 1, Color.BLACK.value)
         score_surface = font.render(
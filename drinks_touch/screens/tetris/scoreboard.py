@@ -2,6 +2,7 @@ import pygame
 from pygame import Vector2
 
 from config import Color, Font
+from fonts import get_font
 from screens.tetris.utils import darken
 
 from typing import TYPE_CHECKING
@@ -67,10 +68,10 @@ class Scoreboard:
             border_radius=10,
         )
 
-        title_font = pygame.font.Font(Font.MONOSPACE.value, 20)
+        title_font = get_font(Font.MONOSPACE, 20)
         text_surface = title_font.render(self.title, 1, Color.BLACK.value)
 
-        label_font = pygame.font.Font(Font.MONOSPACE.value, 11)
+        label_font = get_font(Font.MONOSPACE, 11)
         points_label = label_font.render("points", 1, Color.BLACK.value)
         blocks_label = label_font.render("blocks", 1, Color.BLACK.value)
 
@@ -80,7 +81,7 @@ class Scoreboard:
         surface.blit(blocks_label, (size.x - 80, 3))
 
         surface.blit(text_surface, (5, 10))
-        row_font = pygame.font.Font(Font.MONOSPACE.value, 13)
+        row_font = get_font(Font.MONOSPACE, 13)
 
         # only render the scores around the current player, so that they are always visible
         current_player_index = 0
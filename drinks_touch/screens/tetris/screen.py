@@ -60,6 +60,9 @@ def rgb_to_hex(rgb: tuple[int, int, int]) -> str:
 class TetrisScreen(Screen):
     nav_bar_visible = False
     background_color = darken(Color.PRIMARY, 0.8)
+    track_damage = False
+    animating = True
+    poll_hash = True
 
     @classmethod
     @functools.lru_cache(maxsize=16)
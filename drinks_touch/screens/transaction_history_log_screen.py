@@ -3,6 +3,7 @@ from sqlalchemy import select, func
 import config
 from config import Color
 from database.models import Account, Tx
+from database.pagination import keyset_page
 from database.storage import with_db, Session
 from elements import Label, Button, SvgIcon
 from elements.hbox import HBox
@@ -13,6 +14,7 @@ from screens.transaction_history_stats_screen import TransactionHistoryStatsScre
 
 class TransactionHistoryLogScreen(Screen):
     PAGE_SIZE = 8
+    observed = Screen.observed | {"page", "total_pages"}
 
     def __init__(self, account: Account):
         super().__init__()
@@ -20,6 +22,9 @@ class TransactionHistoryLogScreen(Screen):
         self.account = account
         self.page = 1
         self.total_pages = 1
+        # (created_at, id) of the first and last transaction on the current
+        # page, the previous and next pages start there
+        self.page_keys: tuple[tuple, tuple] | None = None
 
     def calculate_hash(self):
         return hash(
@@ -122,20 +127,29 @@ class TransactionHistoryLogScreen(Screen):
         self.total_pages = self.total_items // TransactionHistoryLogScreen.PAGE_SIZE + (
             1 if self.total_items % TransactionHistoryLogScreen.PAGE_SIZE > 0 else 0
         )
-        self.go_to_page(self.page)
+        # The keys of the current page might be outdated
+        self.go_to_page(1)
 
     @with_db
     def load_transactions(self, page: int) -> list[Tx]:
         if not self.account.tx_history_visible:
             return []
-        query = (
-            select(Tx)
-            .where(Tx.account_id == self.account.id)
-            .order_by(Tx.created_at.desc())
-            .offset((page - 1) * TransactionHistoryLogScreen.PAGE_SIZE)
-            .limit(TransactionHistoryLogScreen.PAGE_SIZE)
-        )
-        return Session().execute(query).scalars().all()
+        query = select(Tx).where(Tx.account_id == self.account.id)
+        order = (Tx.created_at, Tx.id)
+        page_size = TransactionHistoryLogScreen.PAGE_SIZE
+        if page == 1:
+            result = keyset_page(query, order, page_size)
+        elif page == self.total_pages:
+            # Aligned to the first page, like the pages before it
+            size = self.total_items - (self.total_pages - 1) * page_size
+            result = keyset_page(query, order, size, last=True)
+        elif page == self.page + 1:
+            result = keyset_page(query, order, page_size, after=self.page_keys[1])
+        elif page == self.page - 1:
+            result = keyset_page(query, order, page_size, before=self.page_keys[0])
+        else:
+            raise ValueError(f"Can't jump from page {self.page} to {page}")
+        return result.items
 
     @with_db
     def count_transactions(self) -> int:
@@ -145,6 +159,9 @@ class TransactionHistoryLogScreen(Screen):
     @with_db
     def toggle_history_lock(self, button: Button):
         self.account.tx_history_visible = not self.account.tx_history_visible
+        # The account might come from the local replica and be detached
+        account = Session().get(Account, self.account.id)
+        account.tx_history_visible = self.account.tx_history_visible
         if self.account.tx_history_visible:
             button.inner.path = "drinks_touch/resources/images/lock.svg"
         else:
@@ -155,8 +172,13 @@ class TransactionHistoryLogScreen(Screen):
     def go_to_page(self, page: int):
         if not (1 <= page <= self.total_pages):
             return
-        self.page = page
         transactions = self.load_transactions(page)
+        self.page = page
+        if transactions:
+            first, last = transactions[0], transactions[-1]
+            self.page_keys = (first.created_at, first.id), (last.created_at, last.id)
+        else:
+            self.page_keys = None
         pagination_text = f"{self.page:4} / {self.total_pages:4}"
         # from_item = (self.page - 1) * TransactionHistoryLogScreen.PAGE_SIZE + 1
         # to_item = min(self.page * TransactionHistoryLogScreen.PAGE_SIZE, self.total_items)
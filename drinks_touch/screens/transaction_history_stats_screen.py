@@ -6,15 +6,11 @@ from sqlalchemy import select, func
 
 import config
 from config import Color
-from database.models import Account, Tx
+from database.models import Account, AccountMonth
 from database.storage import with_db, Session
 from elements import Label
 from elements.vbox import VBox
 from screens.screen import Screen
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import pandas as pd
-
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +23,9 @@ def to_mpl_color(color: Color) -> tuple[float, float, float]:
 
 
 class TransactionHistoryStatsScreen(Screen):
+    track_damage = False
+    observed = Screen.observed | {"graph_surface"}
+
     def __init__(self, account: Account):
         super().__init__()
 
@@ -67,26 +66,26 @@ class TransactionHistoryStatsScreen(Screen):
 
     @with_db
     def plot_account_balance(self) -> pygame.Surface:
-
+        # matplotlib and pandas take seconds to import, so they are only
+        # imported when a graph is actually shown
+        import matplotlib.pyplot as plt
+        import matplotlib.dates as mdates
+        import pandas as pd
+
+        # One row per month, kept up to date by a trigger, instead of
+        # aggregating all transactions of the account every time
         stmt = (
-            select(
-                func.date_trunc("month", Tx.created_at).label("month"),
-                func.sum(Tx.amount).label("summed"),
-            )
-            .where(Tx.account_id == self.account.id)
-            .group_by(func.date_trunc("month", Tx.created_at))
-            .order_by("month")
+            select(AccountMonth.month, AccountMonth.closing_balance)
+            .where(AccountMonth.account_id == self.account.id)
+            .order_by(AccountMonth.month)
         )
 
-        logger.debug("Executing SQL statement to fetch transaction data")
-        transactions = Session().execute(stmt).all()
-        logger.debug(f"Fetched {len(transactions)} transactions")
+        logger.debug("Executing SQL statement to fetch monthly balances")
+        months = Session().execute(stmt).all()
+        logger.debug(f"Fetched {len(months)} months")
 
-        # Build a DataFrame and compute cumulative balance
         logger.debug("Building DataFrame for plotting")
-        df = pd.DataFrame(transactions, columns=["timestamp", "amount"])
-        logger.debug("Calculating cumulative balance")
-        df["balance"] = df["amount"].cumsum()
+        df = pd.DataFrame(months, columns=["timestamp", "balance"])
 
         bg_color = to_mpl_color(Color.BACKGROUND)
         text_color = to_mpl_color(Color.PRIMARY)
@@ -168,5 +167,7 @@ class TransactionHistoryStatsScreen(Screen):
 
     @with_db
     def count_transactions(self) -> int:
-        query = select(func.count(Tx.id)).where(Tx.account_id == self.account.id)
+        query = select(func.coalesce(func.sum(AccountMonth.tx_count), 0)).where(
+            AccountMonth.account_id == self.account.id
+        )
         return Session().execute(query).scalar()
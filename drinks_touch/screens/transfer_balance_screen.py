@@ -28,7 +28,7 @@ def auto_complete_account_name(text, except_account: str | None = None, limit=10
     query = (
         select(Account)
         .where(
-            Account.name.ilike(f"{text}%"),
+            Account.name_starts_with(text),
             Account.enabled,
             Account.name != except_account,
         )
@@ -49,7 +49,7 @@ def auto_complete_account_name(text, except_account: str | None = None, limit=10
                 func.count(Account.id),
             )
             .filter(Account.name != except_account)
-            .filter(Account.name.ilike(f"{text}%"))
+            .filter(Account.name_starts_with(text))
             .group_by("n_char")
             .order_by("n_char")
             .all()
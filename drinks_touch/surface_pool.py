@@ -0,0 +1,116 @@
+import contextlib
+import weakref
+from collections import OrderedDict
+
+from pygame import Surface
+
+with contextlib.redirect_stdout(None):
+    import pygame
+
+
+class SurfacePool:
+    """
+    Hands out surfaces in the pixel format of the display, so that blitting
+    them doesn't require a conversion. Surfaces given back via `release()` are
+    reused for the next request of the same size.
+    """
+
+    # Number of free surfaces kept per size and in total
+    MAX_PER_SIZE = 4
+    MAX_SURFACES = 128
+
+    def __init__(self):
+        self._free: OrderedDict[tuple[int, int, bool], list[Surface]] = OrderedDict()
+        self._n_free = 0
+        # Surfaces that were handed out and not released yet, by id.
+        # Weak, because surfaces of discarded elements are never released.
+        self._leased: weakref.WeakValueDictionary[int, Surface] = (
+            weakref.WeakValueDictionary()
+        )
+        self.allocations = 0
+        self.hits = 0
+        self.releases = 0
+
+    def get(self, size: tuple[float, float], alpha: bool = True) -> Surface:
+        """
+        Returns a cleared surface. Transparent if `alpha` is set, black otherwise.
+        """
+        key = (max(0, int(size[0])), max(0, int(size[1])), alpha)
+        if free := self._free.get(key):
+            surface = free.pop()
+            self._n_free -= 1
+            self._free.move_to_end(key)
+            surface.fill((0, 0, 0, 0) if alpha else (0, 0, 0))
+            self.hits += 1
+        else:
+            surface = self._allocate(key[:2], alpha)
+            self.allocations += 1
+        self._leased[id(surface)] = surface
+        return surface
+
+    def release(self, surface: Surface | None):
+        """
+        Gives a surface back to the pool. Surfaces that weren't created by
+        the pool (e.g. cached images) are ignored, so it is safe to pass
+        anything that a `_render` method returned.
+        """
+        if surface is None or self._leased.pop(id(surface), None) is None:
+            return
+        self.releases += 1
+        key = (*surface.get_size(), bool(surface.get_flags() & pygame.SRCALPHA))
+        free = self._free.setdefault(key, [])
+        self._free.move_to_end(key)
+        if len(free) >= self.MAX_PER_SIZE:
+            return
+        surface.set_alpha(None)
+        surface.set_colorkey(None)
+        surface.set_clip(None)
+        free.append(surface)
+        self._n_free += 1
+        while self._n_free > self.MAX_SURFACES:
+            # Drop surfaces of the size that wasn't requested for the longest time
+            _, oldest = next(iter(self._free.items()))
+            if oldest:
+                oldest.pop()
+                self._n_free -= 1
+            else:
+                self._free.popitem(last=False)
+
+    @staticmethod
+    def _allocate(size: tuple[int, int], alpha: bool) -> Surface:
+        if alpha:
+            surface = Surface(size, pygame.SRCALPHA)
+        else:
+            surface = Surface(size)
+        if pygame.display.get_surface() is None:
+            # No display format to convert to, e.g. in the web server
+            return surface
+        return surface.convert_alpha() if alpha else surface.convert()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "allocations": self.allocations,
+            "hits": self.hits,
+            "releases": self.releases,
+            "leased": len(self._leased),
+            "free": self._n_free,
+        }
+
+
+_pool = SurfacePool()
+
+
+def get_surface(size: tuple[float, float], alpha: bool = True) -> Surface:
+    """
+    Use this instead of `pygame.Surface()` when rendering elements.
+    """
+    return _pool.get(size, alpha)
+
+
+def release_surface(surface: Surface | None):
+    _pool.release(surface)
+
+
+def surface_pool_stats() -> dict[str, int]:
+    return _pool.stats
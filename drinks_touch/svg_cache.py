@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of rasterized SVG images.
+
+Rasterizing SVGs with cairosvg is slow and used to dominate the startup time.
+Rasterized images are stored as PNGs, named after the content of the SVG file,
+the output size and the tint. Changed SVG files therefore get a new cache entry.
+
+Run this file from the repository root to pre-warm the cache, e.g. after a deployment:
+
+    $ ./drinks_touch/svg_cache.py
+"""
+
+import ast
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+from pygame import Surface
+
+import config
+from config import Color
+
+with contextlib.redirect_stdout(None):
+    import pygame
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATH = config.SVG_CACHE_PATH / "manifest.json"
+
+
+def _cache_file(
+    path: Path, color: Color | None, width: int | None, height: int | None
+) -> Path:
+    svg_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+    tint = color.name if color else "none"
+    key = f"{svg_hash}-{width}x{height}-{tint}"
+    return config.SVG_CACHE_PATH / f"{hashlib.sha256(key.encode()).hexdigest()}.png"
+
+
+def rasterize(
+    path: str | Path,
+    color: Color | None = None,
+    width: int | None = None,
+    height: int | None = None,
+) -> Surface:
+    """
+    Returns the rasterized and tinted SVG from the cache, rasterizes it if needed.
+    The surface is not converted to the display format yet.
+    """
+    path = Path(path)
+    cache_file = _cache_file(path, color, width, height)
+    if cache_file.exists():
+        try:
+            return pygame.image.load(cache_file)
+        except pygame.error:
+            logger.warning(
+                "Broken cache entry %s, rasterizing %s again", cache_file, path
+            )
+
+    # Only imported if needed, because importing it takes a while
+    import cairosvg
+
+    png_bytes = cairosvg.svg2png(
+        url=str(path), output_width=width, output_height=height
+    )
+    image = pygame.image.load(io.BytesIO(png_bytes))
+    if color:
+        image.fill(color.value, special_flags=pygame.BLEND_RGBA_MIN)
+    try:
+        _store(cache_file, image)
+        _remember(path, color, width, height)
+    except OSError:
+        logger.exception("Could not write %s", cache_file)
+    return image
+
+
+def _store(cache_file: Path, image: Surface):
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first, so that a crash doesn't leave a broken PNG
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp.png")
+    pygame.image.save(image, tmp_file)
+    os.replace(tmp_file, cache_file)
+
+
+def _load_manifest() -> list[dict]:
+    try:
+        return json.loads(MANIFEST_PATH.read_text())
+    except (OSError, ValueError):
+        return []
+
+
+def _remember(path: Path, color: Color | None, width: int | None, height: int | None):
+    """
+    Records which images are used, so that they are pre-warmed on the next deployment
+    """
+    entry = {
+        "path": str(path),
+        "color": color.name if color else None,
+        "width": width,
+        "height": height,
+    }
+    manifest = _load_manifest()
+    if entry in manifest:
+        return
+    manifest.append(entry)
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2))
+
+
+def _literal(node: ast.expr):
+    """
+    Value of a string, number or Color constant, otherwise raises ValueError
+    """
+    if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "Path":
+        return _literal(node.args[0])
+    if isinstance(node, ast.Attribute) and node.attr in Color.__members__:
+        return Color[node.attr]
+    return ast.literal_eval(node)
+
+
+def find_referenced_images(source_dir: Path) -> list[tuple]:
+    """
+    Finds calls to `SvgIcon(...)` and `SvgIcon.load_image(...)` with constant arguments
+    """
+    images = []
+    for file in sorted(source_dir.rglob("*.py")):
+        for node in ast.walk(ast.parse(file.read_text(), str(file))):
+            if not isinstance(node, ast.Call) or not node.args:
+                continue
+            func = node.func
+            is_svg_icon = getattr(func, "id", None) == "SvgIcon"
+            is_load_image = getattr(func, "attr", None) == "load_image"
+            if not is_svg_icon and not is_load_image:
+                continue
+            try:
+                path = _literal(node.args[0])
+                kwargs = {kw.arg: _literal(kw.value) for kw in node.keywords}
+                if is_load_image:
+                    kwargs.update(
+                        zip(("color", "width", "height"), map(_literal, node.args[1:]))
+                    )
+            except (ValueError, TypeError, SyntaxError):
+                # Computed at runtime, covered by the manifest
+                continue
+            images.append(
+                (
+                    str(path),
+                    kwargs.get("color"),
+                    kwargs.get("width"),
+                    kwargs.get("height"),
+                )
+            )
+    return images
+
+
+def prewarm() -> int:
+    images = set(find_referenced_images(Path(__file__).parent))
+    for entry in _load_manifest():
+        color = Color[entry["color"]] if entry["color"] else None
+        images.add((entry["path"], color, entry["width"], entry["height"]))
+
+    failed = 0
+    for path, color, width, height in sorted(images, key=str):
+        if not Path(path).exists():
+            logger.warning("%s doesn't exist (anymore)", path)
+            continue
+        try:
+            rasterize(path, color, width, height)
+        except Exception:
+            logger.exception("Could not rasterize %s", path)
+            failed += 1
+    print(f"{len(images) - failed} images cached in {config.SVG_CACHE_PATH}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(prewarm())
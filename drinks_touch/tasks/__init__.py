@@ -5,3 +5,4 @@ from .download_calendar import DownloadCalendarTask
 from .sync_from_keycloak import SyncFromKeycloakTask
 from .send_mail import SendMailTask
 from .sepa_sync import SepaSyncTask
+from .reconcile_balances import ReconcileBalancesTask
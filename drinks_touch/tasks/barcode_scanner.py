@@ -8,6 +8,7 @@ import logging
 
 import config
 from env import is_pi
+from frame_scheduler import wake
 from tasks.run_cmd import CheckoutAndRestartTask
 
 logger = logging.getLogger(__name__)
@@ -53,6 +54,7 @@ class BarcodeWorker:
 
     @staticmethod
     def on_barcode(barcode):
+        wake(display=True)
         screen = ScreenManager.instance.get_active()
 
         if barcode == "RESTART":
@@ -1,10 +1,15 @@
+import heapq
 import threading
 import time
+import weakref
+from collections.abc import Callable
+from datetime import timedelta
 from random import random
 
 from sentry_sdk.integrations.logging import ignore_logger
 
 from elements.progress_bar import ProgressBar
+from frame_scheduler import wake
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,6 +29,20 @@ class LogHandler(logging.Handler):
 
 class BaseTask:
     ON_STARTUP = False
+    # Tasks of these classes must have succeeded before this one starts, if
+    # they run in the same TaskScheduler. Tasks in different schedulers aren't
+    # ordered, periodic_tasks.py runs the dependencies of a due task with it.
+    DEPENDS_ON: tuple[type["BaseTask"], ...] = ()
+    # Tasks that are ready at the same time start in descending order
+    PRIORITY = 0
+    # The task only runs while at most this many tasks run, including itself
+    MAX_CONCURRENCY: int | None = None
+    # Failed runs are repeated, waiting RETRY_DELAY seconds before the first
+    # retry and twice as long before every further one
+    RETRIES = 0
+    RETRY_DELAY = 2
+    # Runs in the background this often, see periodic_tasks.py
+    INTERVAL: timedelta | None = None
 
     def __init__(self):
         self.progress_bar: ProgressBar | None = None
@@ -34,6 +53,9 @@ class BaseTask:
         self.status = None
         self.sig_killed = False
         self.thread = None
+        self.queued_at: float | None = None
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
 
         self.logger = logging.getLogger(self.__class__.__name__)
         ignore_logger(self.logger.name)
@@ -64,9 +86,34 @@ class BaseTask:
         self.progress_bar = ProgressBar(*args, **kwargs, label=self.LABEL, text=None)
         return self.progress_bar
 
-    def start(self):
+    @property
+    def queue_time(self) -> float | None:
+        """
+        Seconds between being queued and starting
+        """
+        if self.started_at is None:
+            return None
+        return self.started_at - (self.queued_at or self.started_at)
+
+    @property
+    def run_time(self) -> float | None:
+        """
+        Seconds between starting and finishing, including retries
+        """
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def start(self, on_done: Callable[["BaseTask"], None] | None = None):
+        """
+        Runs the task in a thread. `on_done` is called in this thread when
+        the task succeeded or failed.
+        """
         self.reset()
-        self.thread = threading.Thread(target=self._run)
+        self.started_at = time.monotonic()
+        self.thread = threading.Thread(
+            target=self._run, args=(on_done,), name=self.__class__.__name__
+        )
         self.thread.daemon = True
         self.thread.start()
 
@@ -78,17 +125,40 @@ class BaseTask:
         self.status = None
         self.progress = None
         self.sig_killed = False
-        self.progress_bar.reset()
-
-    def _run(self):
-        try:
-            self.run()
-        except Exception as e:
-            logger.exception(f"Error in task {self.LABEL}")
-            self.logger.error(f"{e.__class__.__name__}: {e}")
-            self._fail()
-        else:
-            self._success()
+        self.finished_at = None
+        if self.progress_bar is not None:
+            self.progress_bar.reset()
+
+    def _run(self, on_done: Callable[["BaseTask"], None] | None = None):
+        delay = self.RETRY_DELAY
+        for attempt in range(self.RETRIES + 1):
+            try:
+                self.run()
+            except Exception as e:
+                logger.exception(f"Error in task {self.LABEL}")
+                self.logger.error(f"{e.__class__.__name__}: {e}")
+                if attempt < self.RETRIES and self._sleep(delay):
+                    self.logger.info(f"Neuer Versuch nach {delay}s")
+                    self.progress = None
+                    delay *= 2
+                    continue
+                self._fail()
+            else:
+                self._success()
+            break
+        self.finished_at = time.monotonic()
+        wake()
+        if on_done is not None:
+            on_done(self)
+
+    def _sleep(self, seconds: float) -> bool:
+        """
+        Returns False if the task was killed in the meantime
+        """
+        end = time.monotonic() + seconds
+        while not self.sig_killed and time.monotonic() < end:
+            time.sleep(0.1)
+        return not self.sig_killed
 
     def run(self):
         for i in range(100):
@@ -111,9 +181,179 @@ class BaseTask:
         self.finished = True
         self.status = status
 
+    def skip(self, reason: str):
+        """
+        Marks the task as failed without running it
+        """
+        self.reset()
+        self.logger.error(reason)
+        self._fail()
+        wake()
+
     def kill(self):
         self.sig_killed = True
-        self.thread.join()
+        if self.thread is not None:
+            self.thread.join()
 
     def on_barcode(self, barcode):
         pass
+
+
+class TaskScheduler:
+    """
+    Runs tasks in at most MAX_WORKERS threads at once, taking the
+    dependencies, priorities and concurrency limits of the tasks into account.
+    A task whose dependency failed is skipped. A task doesn't start while
+    a task of the same class runs in another scheduler.
+
+    `on_done` is called with every task that succeeded, failed or was
+    skipped, in the thread of the task.
+    """
+
+    MAX_WORKERS = 3
+    # Shared by all schedulers, to find tasks running in other schedulers
+    lock = threading.Lock()
+    schedulers: "weakref.WeakSet[TaskScheduler]" = weakref.WeakSet()
+
+    def __init__(
+        self,
+        tasks: list[BaseTask],
+        max_workers: int | None = None,
+        on_done: Callable[[BaseTask], None] | None = None,
+    ):
+        self.tasks = tasks
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.on_done = on_done
+        self.waiting: list[BaseTask] = []
+        self.running: list[BaseTask] = []
+        self.done: list[BaseTask] = []
+        self.dependencies = {
+            task: [
+                other
+                for other in tasks
+                if other is not task and isinstance(other, task.DEPENDS_ON)
+            ]
+            for task in tasks
+        }
+        self._check_cycles()
+
+    def _check_cycles(self):
+        visiting, visited = set(), set()
+
+        def visit(task: BaseTask):
+            if task in visited:
+                return
+            if task in visiting:
+                raise ValueError(f"Circular dependency of task {task.LABEL}")
+            visiting.add(task)
+            for dependency in self.dependencies[task]:
+                visit(dependency)
+            visiting.remove(task)
+            visited.add(task)
+
+        for task in self.tasks:
+            visit(task)
+
+    def start(self):
+        now = time.monotonic()
+        with self.lock:
+            for task in self.tasks:
+                task.queued_at = now
+            self.waiting = list(self.tasks)
+            self.running = []
+            self.done = []
+            TaskScheduler.schedulers.add(self)
+        self._dispatch()
+
+    @property
+    def finished(self) -> bool:
+        return not self.waiting and not self.running
+
+    def kill(self):
+        with self.lock:
+            self.waiting = []
+            running = list(self.running)
+        for task in running:
+            task.kill()
+
+    def _runs_elsewhere(self, task: BaseTask) -> bool:
+        return any(
+            type(other) is type(task)
+            for scheduler in TaskScheduler.schedulers
+            if scheduler is not self
+            for other in scheduler.running
+        )
+
+    def _can_start(self, task: BaseTask) -> bool:
+        if len(self.running) >= self.max_workers:
+            return False
+        count = len(self.running) + 1
+        return all(
+            other.MAX_CONCURRENCY is None or count <= other.MAX_CONCURRENCY
+            for other in [task, *self.running]
+        )
+
+    def _dispatch(self):
+        to_start, to_skip = [], []
+        with self.lock:
+            # Order in the list breaks ties between equal priorities
+            queue = [(-task.PRIORITY, i, task) for i, task in enumerate(self.waiting)]
+            heapq.heapify(queue)
+            while queue:
+                _, _, task = heapq.heappop(queue)
+                dependencies = self.dependencies[task]
+                failed = [
+                    dependency
+                    for dependency in dependencies
+                    if dependency in self.done and dependency.status != 0
+                ]
+                if failed:
+                    self.waiting.remove(task)
+                    self.done.append(task)
+                    to_skip.append((task, failed))
+                    continue
+                if not all(dependency in self.done for dependency in dependencies):
+                    continue
+                if self._runs_elsewhere(task):
+                    continue
+                if not self._can_start(task):
+                    # Otherwise tasks with a lower priority could overtake
+                    # a task that waits for a free worker indefinitely
+                    break
+                self.waiting.remove(task)
+                self.running.append(task)
+                to_start.append(task)
+        for task, failed in to_skip:
+            labels = ", ".join(dependency.LABEL for dependency in failed)
+            task.skip(f"Übersprungen, weil fehlgeschlagen: {labels}")
+            if self.on_done is not None:
+                self.on_done(task)
+        for task in to_start:
+            task.start(on_done=self._on_done)
+        if to_skip:
+            # Tasks depending on the skipped ones are skipped as well
+            self._dispatch()
+
+    def _on_done(self, task: BaseTask):
+        with self.lock:
+            if task in self.running:
+                self.running.remove(task)
+            self.done.append(task)
+        logger.info(
+            "Task %s %s after waiting %.1fs and running %.1fs",
+            task.__class__.__name__,
+            "succeeded" if task.status == 0 else "failed",
+            task.queue_time,
+            task.run_time,
+        )
+        if self.on_done is not None:
+            self.on_done(task)
+        # The task might have blocked tasks of the same class elsewhere
+        for scheduler in list(TaskScheduler.schedulers):
+            scheduler._dispatch()
+
+    def report(self) -> list[tuple[str, float | None, float | None]]:
+        """
+        Label, queue time and run time of every task, in seconds
+        """
+        return [(task.LABEL, task.queue_time, task.run_time) for task in self.tasks]
@@ -1,11 +1,15 @@
 from tasks.base import BaseTask
 import threading
+from datetime import timedelta
 import requests
 
 
 class CheckForUpdatesTask(BaseTask):
     LABEL = "Suche nach drinks-touch updates"
     ON_STARTUP = True
+    PRIORITY = -10
+    RETRIES = 2
+    INTERVAL = timedelta(hours=6)
     newest_version_sha_short = ""
     newest_version_lock = threading.Lock()
 
@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 import requests
 
 import config
@@ -7,6 +9,9 @@ from tasks.base import BaseTask
 class DownloadCalendarTask(BaseTask):
     LABEL = "Lade Kalender herunter"
     ON_STARTUP = True
+    PRIORITY = -10
+    RETRIES = 2
+    INTERVAL = timedelta(hours=6)
 
     def run(self):
         self.logger.info("Downloading fd event calendar")
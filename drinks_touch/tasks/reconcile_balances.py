@@ -0,0 +1,74 @@
+import logging
+from datetime import timedelta
+
+from sqlalchemy import func, select, update
+
+from database.models import Account, Tx
+from database.storage import Session, with_db
+from tasks.base import BaseTask
+from tasks.sepa_sync import SepaSyncTask
+
+# Not ignored by sentry, unlike the logger of the task
+logger = logging.getLogger(__name__)
+
+
+class ReconcileBalancesTask(BaseTask):
+    """
+    Compares the stored balance of every account with the sum of its
+    transactions. A difference means that the trigger on the tx table
+    didn't work or was bypassed. It is reported and the balance is corrected.
+    """
+
+    LABEL = "Prüfe Kontostände"
+    ON_STARTUP = True
+    # Checks the balances after the deposits were booked
+    DEPENDS_ON = (SepaSyncTask,)
+    INTERVAL = timedelta(days=1)
+
+    @with_db
+    def run(self):
+        session = Session()
+        # A single statement reads one snapshot, in which the trigger has
+        # updated the balance of every transaction it sees. Transactions
+        # can still be added meanwhile, the table isn't locked.
+        tx_sum = (
+            select(func.coalesce(func.sum(Tx.amount), 0))
+            .where(Tx.account_id == Account.id)
+            .scalar_subquery()
+        )
+        query = select(Account.id, Account.name, Account.stored_balance, tx_sum).where(
+            Account.stored_balance != tx_sum
+        )
+        drifted = session.execute(query).all()
+        self.progress = 0.5
+        if not drifted:
+            self.logger.info("Alle Kontostände stimmen.")
+            return
+
+        for account_id, name, stored_balance, actual_balance in drifted:
+            self.logger.warning(
+                f"{name} ({account_id}): {stored_balance:.2f}€ gespeichert, "
+                f"{actual_balance:.2f}€ laut Transaktionen"
+            )
+        logger.error(
+            "Stored balance of %d accounts differs from their transactions: %s",
+            len(drifted),
+            ", ".join(
+                f"{account_id}: {stored_balance} != {actual_balance}"
+                for account_id, _, stored_balance, actual_balance in drifted
+            ),
+        )
+        ids = [row[0] for row in drifted]
+        # The trigger updates the account of a new transaction, so it waits
+        # for these locks. Afterwards, the next statement sees all committed
+        # transactions of these accounts and none can be added concurrently.
+        session.execute(
+            select(Account.id)
+            .where(Account.id.in_(ids))
+            .order_by(Account.id)
+            .with_for_update()
+        )
+        session.execute(
+            update(Account).where(Account.id.in_(ids)).values(stored_balance=tx_sum)
+        )
+        self.logger.info(f"{len(drifted)} Kontostände korrigiert.")
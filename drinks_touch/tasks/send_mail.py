@@ -1,24 +1,30 @@
 from datetime import datetime, timedelta
 
 from babel import dates
-from sqlalchemy import select
+from sqlalchemy import and_, or_, select
 
 import config
-from database.models import Account
+from database.models import Account, Tx
 from database.storage import Session, with_db
 from notifications.notification import (
     render_jinja_template,
     send_notification,
     format_drinks,
     FOOTER,
-    get_recent_transactions,
+    get_recent_transactions_of_accounts,
 )
 from tasks.base import BaseTask
+from tasks.reconcile_balances import ReconcileBalancesTask
+from tasks.sepa_sync import SepaSyncTask
+from tasks.sync_from_keycloak import SyncFromKeycloakTask
 
 
 class SendMailTask(BaseTask):
     LABEL = "Sende E-Mails"
     ON_STARTUP = True
+    # Mails show the balances, which change with deposits and corrections
+    DEPENDS_ON = (SepaSyncTask, SyncFromKeycloakTask, ReconcileBalancesTask)
+    INTERVAL = timedelta(hours=6)
 
     def run(self):
         self.logger.info("Sending negative balance reminders...")
@@ -38,6 +44,7 @@ class SendMailTask(BaseTask):
     @with_db
     def send_low_balances(self):
         accounts = Session().query(Account).filter(Account.email.isnot(None)).all()
+        Account.load_balances(accounts)
         for i, account in enumerate(accounts):
             self.progress = (i + 1) / len(accounts) / 2
             if self.sig_killed:
@@ -89,17 +96,49 @@ class SendMailTask(BaseTask):
 
         account.last_balance_warning_email_sent_at = datetime.now()
 
+    @staticmethod
+    def summary_due(now: datetime):
+        """
+        Condition for accounts whose summary is due, exactly like the check in
+        `send_summary()`: accounts that were never mailed are always due,
+        whatever their setting. The others only if their setting has an
+        interval and it has passed.
+        """
+        return or_(
+            Account.last_summary_email_sent_at.is_(None),
+            *(
+                and_(
+                    Account.summary_email_notification_setting == setting,
+                    Account.last_summary_email_sent_at <= now - delta,
+                )
+                for setting, delta in config.MAIL_SUMMARY_DELTA.items()
+            ),
+        )
+
     @with_db
     def send_summaries(self):
-        query = select(Account).where(Account.email.isnot(None) & Account.enabled)
+        # Only the due accounts, so that the transactions of the others,
+        # possibly their whole history, aren't loaded
+        query = select(Account).where(
+            Account.email.isnot(None),
+            Account.enabled,
+            self.summary_due(datetime.now()),
+        )
         accounts = Session().scalars(query).all()
+        if not accounts:
+            self.logger.info("No summaries due")
+            return
+        Account.load_balances(accounts)
+        transactions = get_recent_transactions_of_accounts(accounts)
         for i, account in enumerate(accounts):
             self.progress = 0.5 + (i + 1) / len(accounts) / 2
             if self.sig_killed:
                 return
-            self.send_summary(account, "Getränkeübersicht")
+            self.send_summary(
+                account, "Getränkeübersicht", transactions.get(account.id, [])
+            )
 
-    def send_summary(self, account: Account, subject: str):
+    def send_summary(self, account: Account, subject: str, transactions: list[Tx]):
         assert account.email, "Account has no email"
 
         frequency_str = account.summary_email_notification_setting
@@ -124,9 +163,6 @@ class SendMailTask(BaseTask):
             )
         )
 
-        self.logger.info(f"Account {account.id:3} | Checking history...")
-        transactions = get_recent_transactions(account)
-
         if transactions:
             # TODO: Was before only for drinks. Let's replace building content_text
             #       by jinja template rendering, instead of this ugly string concatenation.
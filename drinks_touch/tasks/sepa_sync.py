@@ -1,9 +1,12 @@
-from sqlalchemy import select
+import logging
+
+from sqlalchemy import insert, select
 
 from notifications.notification import send_notification
+from overlays.background import BackgroundOverlay
 from tasks.base import BaseTask
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from json import JSONDecodeError
 
@@ -16,12 +19,17 @@ from database.models import Tx
 from database.models.account import Account
 from database.storage import Session, with_db
 
+# Not ignored by sentry, unlike the logger of the task
+logger = logging.getLogger(__name__)
+
 
 class SepaSyncTask(BaseTask):
     LABEL = "SEPA Synchronisation"
     ON_STARTUP = True
+    PRIORITY = 10
+    RETRIES = 2
+    INTERVAL = timedelta(hours=1)
 
-    @with_db
     def run(self):
         try:
             data = requests.get(
@@ -35,13 +43,34 @@ class SepaSyncTask(BaseTask):
         except JSONDecodeError as e:
             raise Exception("Cannot decode JSON from money server") from e
 
+        # Returns after the commit, a slow mail server mustn't keep the
+        # transaction open
+        mails = self.import_recharges(recharges)
+        if mails:
+            BackgroundOverlay.run(
+                lambda: self.send_mails(mails), label="Sending SEPA confirmations"
+            )
+
+    @with_db
+    def import_recharges(self, recharges: dict[str, list[dict]]) -> list[tuple]:
+        """
+        Books the new charges of all accounts and returns the arguments for
+        `send_notification()` of their confirmation mails
+        """
+        session = Session()
+        query = select(Account).where(Account.ldap_id.in_(list(recharges)))
+        accounts = {account.ldap_id: account for account in session.scalars(query)}
+
+        txs, mails = [], []
         for uid, charges in recharges.items():
             if self.sig_killed:
-                self._fail()
-                break
+                # Rolls back last_sepa_deposit of the accounts processed so
+                # far, nothing is booked or mailed
+                raise Exception("Task was killed while importing charges")
 
-            query = select(Account).filter(Account.ldap_id == uid)
-            account = Session().execute(query).scalar_one()
+            if (account := accounts.get(uid)) is None:
+                self.logger.error("Kein Konto für %s, Aufladungen übersprungen", uid)
+                continue
 
             # Convert and sort by "date" column, just to be sure the charges are processed in the right order.
             # If it's in the wrong order, the "last_sepa_deposit" check may prevent old deposits
@@ -77,19 +106,23 @@ class SepaSyncTask(BaseTask):
                     charge["amount"],
                     account.name,
                 )
-                self.handle_transferred(charge, account)
+                txs.append(
+                    {
+                        "created_at": charge["date"],
+                        "payment_reference": "Aufladung via SEPA",
+                        "account_id": account.id,
+                        "amount": charge["amount"],
+                    }
+                )
+                mails.append(self.confirmation_mail(charge, account))
 
-    @with_db
-    def handle_transferred(self, charge, account: Account):
-        session = Session()
-        tx = Tx(
-            created_at=charge["date"],
-            payment_reference="Aufladung via SEPA",
-            account_id=account.id,
-            amount=charge["amount"],
-        )
-        session.add(tx)
+        if txs:
+            # One executemany instead of a flush per transaction
+            session.execute(insert(Tx), txs)
+        return mails
 
+    @staticmethod
+    def confirmation_mail(charge, account: Account) -> tuple:
         subject = "Aufladung EUR %s für %s" % (charge["amount"], account.name)
         text = "Deine Aufladung über %s€ am %s mit Text '%s' war erfolgreich." % (
             charge["amount"],
@@ -98,11 +131,13 @@ class SepaSyncTask(BaseTask):
         )
         content_text = text  # TODO: use jinja template
         content_html = text  # TODO: use jinja template
-        send_notification(
-            account.email,
-            subject,
-            content_text,
-            content_html,
-            account.ldap_id,
-            blocking=True,
-        )
+        return account.email, subject, content_text, content_html, account.ldap_id
+
+    @staticmethod
+    def send_mails(mails: list[tuple]):
+        for mail in mails:
+            try:
+                send_notification(*mail, blocking=True)
+            except Exception:
+                # The deposit is booked anyway, the other mails should be sent
+                logger.exception("Couldn't send the SEPA confirmation to %s", mail[0])
@@ -1,4 +1,9 @@
-import json
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+
+import requests
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 
 from database.models import AppSettings
 from database.models.account import Account
@@ -10,107 +15,210 @@ from tasks.base import BaseTask
 class SyncFromKeycloakTask(BaseTask):
     LABEL = "Kopiere Nutzer von Keycloak zur Datenbank"
     ON_STARTUP = True
+    PRIORITY = 10
+    RETRIES = 2
+    INTERVAL = timedelta(hours=1)
+
+    # Columns of the account that are copied from Keycloak
+    FIELDS = ("keycloak_sub", "ldap_path", "name", "email", "enabled")
+    # Between full syncs, only the users that changed according to the
+    # events of the realm are fetched. The full sync catches changes that
+    # don't cause an event, e.g. in the LDAP.
+    FULL_SYNC_INTERVAL = timedelta(days=1)
+    # Events are stored when they happened, but might be seen a bit later
+    EVENT_OVERLAP = timedelta(minutes=5)
+    LAST_SYNC_KEY = "keycloak_last_sync"
+    LAST_FULL_SYNC_KEY = "keycloak_last_full_sync"
+
+    def __init__(self):
+        super().__init__()
+        # id -> values of FIELDS, of all accounts
+        self.accounts: dict[int, dict] = {}
+        self.ids_by_sub: dict[str, int] = {}
+        self.ids_by_ldap_path: dict[str, int] = {}
+        self.ids_by_name: dict[str, int] = {}
 
     @with_db
     def run(self):
         self.progress = 0
 
         admin = KeycloakAdmin()
-        self.logger.info("Starting download…")
-        res = admin.get_user_list(stream=True)
-
-        total_size = res.headers.get("content-length")
-        if total_size is None:
-            last_total_size = AppSettings.query.filter(
-                AppSettings.key == "last_keycloak_content_length"
-            ).one_or_none()
-            if last_total_size is not None:
-                total_size = last_total_size.value
-            else:
-                total_size = 0
-
-        total_size = int(total_size)
-        if total_size == 0:
-            self.progress = None
-        block_size = 2048
-
-        raw_response = b""
-        for i, chunk in enumerate(res.iter_content(block_size)):
-            if self.sig_killed:
-                self.logger.error("Task was killed while downloading users")
-                self._fail()
-                return
-            raw_response += chunk
-            self.logger.info(f"Downloaded {len(raw_response):6} bytes")
-            if total_size:
-                if total_size < len(raw_response):
-                    # Last time, we downloaded less than this time.
-                    # We don't know how much more we need to download.
-                    # Show an indeterminate progress bar.
-                    self.progress = None
-                else:
-                    self.progress = len(raw_response) / total_size
-
-        # insert or update the last content length
-        last_total_size = AppSettings.query.filter(
-            AppSettings.key == "last_keycloak_content_length"
-        ).one_or_none()
-        if last_total_size is None:
-            last_total_size = AppSettings(key="last_keycloak_content_length")
-        last_total_size.value = str(len(raw_response))
-        Session().add(last_total_size)
-
-        users = json.loads(raw_response)
-        total_users = len(users)
-        self.logger.info(f"Downloaded {total_users} user accounts")
-        for i, user in enumerate(users):
+        started_at = datetime.now(timezone.utc)
+        self.load_accounts()
+        changed_ids = self.changed_user_ids(admin, started_at)
+        if changed_ids is None:
+            total_users = admin.get_user_count()
+            self.logger.info(f"Downloading {total_users} user accounts…")
+            pages = admin.iter_user_pages()
+        else:
+            total_users = len(changed_ids)
+            self.logger.info(f"Downloading {total_users} changed user accounts…")
+            pages = self.iter_changed_user_pages(admin, changed_ids)
+        synced = created = updated = unchanged = 0
+        # Each page is saved before the next one is downloaded, so memory
+        # doesn't grow with the number of users
+        for page in pages:
             if self.sig_killed:
                 self.logger.error("Task was killed while saving users")
                 self._fail()
                 return
+            inserts, updates, page_unchanged = self.diff(page)
+            created += self.insert_accounts(inserts)
+            self.update_accounts(updates)
+            updated += len(updates)
+            unchanged += page_unchanged
+            synced += len(page)
+            self.logger.info(f"Synced {synced}/{total_users} users")
+            if total_users:
+                # Users might have been added since counting them
+                self.progress = min(synced / total_users, 1)
+        self.logger.info(
+            f"Synced {synced} users: {created} created, {updated} updated, "
+            f"{unchanged} unchanged, {synced - created - updated - unchanged} skipped"
+        )
+        self.set_setting(self.LAST_SYNC_KEY, started_at)
+        if changed_ids is None:
+            self.set_setting(self.LAST_FULL_SYNC_KEY, started_at)
 
-            ldap_entry_dn = user["attributes"].get("LDAP_ENTRY_DN", [None])[0]
-            if account := self.find_account_by_keycloak_id(user["id"]):
-                self.logger.info(f"Updating user {account.keycloak_sub}")
-            elif account := self.find_account_by_ldap_entry_dn(ldap_entry_dn):
-                self.logger.info(f"Updating ldap={account.ldap_path}")
-            elif self.find_account_by_name(user["username"]):
-                self.logger.error(
-                    f"Account with name {user['username']} already exists, but it's neither linked to the "
-                    f"keycloak id {user['id']} nor the ldap path {ldap_entry_dn}"
-                )
-                continue
-            else:
-                account = Account(
-                    keycloak_sub=user["id"],
-                    ldap_path=ldap_entry_dn,
-                )
-                Session.add(account)
-                self.logger.info(
-                    f"Creating user sub={account.keycloak_sub}, ldap_entry_dn={account.ldap_path}"
-                )
-            account.keycloak_sub = user["id"]
-            account.name = user["username"]
-            account.email = user.get("email")
-            account.enabled = user["enabled"]
-            account.ldap_path = ldap_entry_dn
-            self.progress = (i + 1) / total_users
-        self.logger.info(f"Synced {total_users} users")
-
-    def find_account_by_keycloak_id(self, keycloak_id) -> Account | None:
-        if keycloak_id is None:
+    def changed_user_ids(self, admin: KeycloakAdmin, now: datetime) -> set[str] | None:
+        """
+        The users that changed since the last sync, or None if all users
+        have to be synced
+        """
+        last_sync = self.get_setting(self.LAST_SYNC_KEY)
+        last_full_sync = self.get_setting(self.LAST_FULL_SYNC_KEY)
+        if last_sync is None or last_full_sync is None:
             return None
-        self.logger.info(f"Looking for keycloak user {keycloak_id}")
-        return Account.query.filter(Account.keycloak_sub == keycloak_id).one_or_none()
-
-    def find_account_by_ldap_entry_dn(self, ldap_entry_dn) -> Account | None:
-        if ldap_entry_dn is None:
+        if now - last_full_sync > self.FULL_SYNC_INTERVAL:
+            return None
+        try:
+            if not admin.events_enabled():
+                self.logger.info("Events are disabled in Keycloak, syncing all users")
+                return None
+            return admin.changed_user_ids(last_sync - self.EVENT_OVERLAP)
+        except requests.HTTPError as e:
+            self.logger.info(f"Can't read the events, syncing all users: {e}")
             return None
-        self.logger.info(f"Looking for ldap user {ldap_entry_dn}")
-        return Account.query.filter(Account.ldap_path == ldap_entry_dn).one_or_none()
 
-    def find_account_by_name(self, name) -> Account | None:
-        if name is None:
+    def iter_changed_user_pages(
+        self, admin: KeycloakAdmin, user_ids: set[str]
+    ) -> Iterator[list[dict]]:
+        page = []
+        for user_id in user_ids:
+            # Deleted users are ignored, like in a full sync
+            if (user := admin.get_user(user_id)) is not None:
+                page.append(user)
+            if len(page) == admin.PAGE_SIZE:
+                yield page
+                page = []
+        if page:
+            yield page
+
+    @staticmethod
+    def get_setting(key: str) -> datetime | None:
+        setting = Session().get(AppSettings, key)
+        if setting is None or not setting.value:
             return None
-        self.logger.info(f"Looking for username {name}")
-        return Account.query.filter(Account.name == name).one_or_none()
+        return datetime.fromisoformat(setting.value)
+
+    @staticmethod
+    def set_setting(key: str, value: datetime):
+        Session().merge(AppSettings(key=key, value=value.isoformat()))
+
+    def load_accounts(self):
+        query = select(Account.id, *(getattr(Account, field) for field in self.FIELDS))
+        self.accounts = {}
+        self.ids_by_sub = {}
+        self.ids_by_ldap_path = {}
+        self.ids_by_name = {}
+        for row in Session().execute(query):
+            values = row._asdict()
+            account_id = values.pop("id")
+            if values["keycloak_sub"] is not None:
+                values["keycloak_sub"] = str(values["keycloak_sub"])
+            self._index(account_id, values)
+
+    def _index(self, account_id: int, values: dict):
+        if old_values := self.accounts.get(account_id):
+            self.ids_by_sub.pop(old_values["keycloak_sub"], None)
+            self.ids_by_ldap_path.pop(old_values["ldap_path"], None)
+            self.ids_by_name.pop(old_values["name"], None)
+        self.accounts[account_id] = values
+        for ids, key in (
+            (self.ids_by_sub, values["keycloak_sub"]),
+            (self.ids_by_ldap_path, values["ldap_path"]),
+            (self.ids_by_name, values["name"]),
+        ):
+            if key is not None:
+                ids[key] = account_id
+
+    def diff(self, users: list[dict]) -> tuple[list[dict], list[dict], int]:
+        """
+        Returns the values of the accounts to create, the ids and values of
+        the accounts to update and the number of unchanged accounts
+        """
+        inserts, updates, unchanged = [], [], 0
+        for user in users:
+            ldap_entry_dn = user["attributes"].get("LDAP_ENTRY_DN", [None])[0]
+            values = {
+                "keycloak_sub": user["id"],
+                "ldap_path": ldap_entry_dn,
+                "name": user["username"],
+                "email": user.get("email"),
+                "enabled": user["enabled"],
+            }
+            account_id = self.ids_by_sub.get(user["id"])
+            if account_id is None and ldap_entry_dn is not None:
+                account_id = self.ids_by_ldap_path.get(ldap_entry_dn)
+                if account_id is not None:
+                    self.logger.info(f"Linking ldap={ldap_entry_dn} to {user['id']}")
+            if account_id is None:
+                if user["username"] in self.ids_by_name:
+                    self.logger.error(
+                        f"Account with name {user['username']} already exists, but it's neither linked to the "
+                        f"keycloak id {user['id']} nor the ldap path {ldap_entry_dn}"
+                    )
+                    continue
+                inserts.append(values)
+            elif self.accounts[account_id] == values:
+                unchanged += 1
+            else:
+                updates.append({"id": account_id, **values})
+        return inserts, updates, unchanged
+
+    def insert_accounts(self, inserts: list[dict]) -> int:
+        """
+        Returns the number of created accounts. Accounts that conflict with
+        an existing one, e.g. by their email address, are skipped.
+        """
+        if not inserts:
+            return 0
+        query = (
+            insert(Account)
+            .values(inserts)
+            .on_conflict_do_nothing()
+            .returning(Account.id, Account.keycloak_sub)
+        )
+        values_by_sub = {values["keycloak_sub"]: values for values in inserts}
+        created = 0
+        for account_id, keycloak_sub in Session().execute(query):
+            values = values_by_sub.pop(str(keycloak_sub))
+            self._index(account_id, values)
+            self.logger.info(
+                f"Creating user sub={keycloak_sub}, ldap_entry_dn={values['ldap_path']}"
+            )
+            created += 1
+        for values in values_by_sub.values():
+            self.logger.error(
+                f"Couldn't create user {values['name']}, it conflicts with another account"
+            )
+        return created
+
+    def update_accounts(self, updates: list[dict]):
+        if not updates:
+            return
+        # Bulk UPDATE by primary key, executed with executemany
+        Session().execute(update(Account), updates)
+        for values in updates:
+            values = dict(values)
+            self._index(values.pop("id"), values)
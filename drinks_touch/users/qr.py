@@ -1,5 +1,4 @@
 import io
-import qrcode
 import random
 import re
 import string
@@ -24,6 +23,9 @@ def make_sepa_qr(
 
 
 def make_qr_code(data, pixel_width=10, border=4, color="black", bg="white"):
+    # Only imported if needed, because importing it takes a while
+    import qrcode
+
     qr = qrcode.QRCode(
         version=None,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
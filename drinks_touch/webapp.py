@@ -1,6 +1,11 @@
 #!/usr/bin/env python3
 
+# Must be the first import, to measure how long the other imports take
+import boot_profile
+
 from webserver.webserver import run
 
 if __name__ == "__main__":
+    boot_profile.mark("imports")
+    boot_profile.report(budget=None)
     run()
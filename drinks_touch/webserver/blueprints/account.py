@@ -1,12 +1,32 @@
-from flask import Blueprint, render_template, g, redirect, url_for, flash
+import time
+import uuid
+from datetime import datetime
+
+from flask import (
+    Blueprint,
+    render_template,
+    g,
+    redirect,
+    url_for,
+    flash,
+    request,
+    abort,
+)
 from flask_wtf import FlaskForm
+from sqlalchemy import func
 from wtforms import SelectField, BooleanField
 
 from database.models import Tx
+from database.pagination import keyset_page
 from webserver.shared import oidc, db
 
 bp = Blueprint("account", __name__)
 
+TX_HISTORY_PAGE_SIZE = 20
+TX_COUNT_CACHE_SECONDS = 60
+# Account id -> (time.monotonic() when counted, number of transactions)
+_tx_counts: dict[int, tuple[float, int]] = {}
+
 
 class AccountForm(FlaskForm):
     tx_history_visible = BooleanField("Transaktionshistorie am Scanner anzeigen")
@@ -44,16 +64,50 @@ def index():
 @bp.route("/tx-history", methods=["GET"])
 @oidc.require_login
 def txhistory():
-    # txs = (
-    #     db.session.query(db.models.Tx)
-    #     .filter_by(account_id=g.account.id)
-    #     .order_by(db.models.Tx.created_at.desc())
-    #     .all()
-    # )
-    query = (
-        db.select(Tx)
-        .where(Tx.account_id == g.account.id)
-        .order_by(Tx.created_at.desc())
+    # Keyset pagination, see keyset_page. The cursors are the key of the
+    # first or last transaction of the page that links to the requested one.
+    try:
+        after = _parse_cursor(request.args.get("after"))
+        before = _parse_cursor(request.args.get("before"))
+    except ValueError:
+        abort(400)
+    query = db.select(Tx).where(Tx.account_id == g.account.id)
+    page = keyset_page(
+        query,
+        (Tx.created_at, Tx.id),
+        TX_HISTORY_PAGE_SIZE,
+        after=after,
+        before=before,
+        session=db.session,
+    )
+    return render_template(
+        "account/tx_history.html",
+        transactions=page.items,
+        newer=_cursor(page.items[0]) if page.has_newer and page.items else None,
+        older=_cursor(page.items[-1]) if page.has_older and page.items else None,
+        total=_count_transactions(g.account.id),
     )
-    txs = db.paginate(query, per_page=20, max_per_page=100)
-    return render_template("account/tx_history.html", transactions=txs)
+
+
+def _cursor(tx: Tx) -> str:
+    return f"{tx.created_at.isoformat()}_{tx.id}"
+
+
+def _parse_cursor(cursor: str | None) -> tuple[datetime, uuid.UUID] | None:
+    if not cursor:
+        return None
+    created_at, _, tx_id = cursor.rpartition("_")
+    return datetime.fromisoformat(created_at), uuid.UUID(tx_id)
+
+
+def _count_transactions(account_id: int) -> int:
+    """
+    Counting takes as long as reading all transactions of the account, so
+    the result is reused for a while
+    """
+    now = time.monotonic()
+    cached = _tx_counts.get(account_id)
+    if cached is None or now - cached[0] > TX_COUNT_CACHE_SECONDS:
+        query = db.select(func.count(Tx.id)).where(Tx.account_id == account_id)
+        cached = _tx_counts[account_id] = (now, db.session.execute(query).scalar())
+    return cached[1]